@@ -0,0 +1,243 @@
+'''
+Interfaz de línea de comandos para cifrar y descifrar archivos con los
+cifrados clásicos. Se ejecuta desde el directorio src/:
+
+    python3 -m clasicos encrypt --cipher affine --clave 19,2 ../data/Texto1.txt
+    python3 -m clasicos decrypt --cipher vigenere --clave dinamitabb -o claro.txt cifrado.txt
+
+El archivo de entrada se mapea en memoria y se procesa por partes de tamaño
+fijo, así que la memoria usada no depende del tamaño del archivo. El texto se
+limpia igual que con limpiar_texto y el resultado se escribe en grupos de 5
+letras, conforme se va produciendo.
+'''
+
+import argparse
+import codecs
+import math
+import mmap
+import os
+import sys
+
+# Los módulos de los cifrados se importan entre sí por nombre, como cuando se
+# ejecutan desde este directorio.
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from monoalfabetico import CifradoAfin, limpiar_partes, limpiar_texto, alfabeto
+from polialfabetico import vigenere_bytes
+from hill import CifradoHill, matriz_inversa_mod26
+from playfair import CuadroPlayfair, construye_cuadro
+
+# ------------------------------------------------------------------------------
+# --                              FUNCIONES                                   --
+# ------------------------------------------------------------------------------
+
+def partes_archivo(ruta, tamanno=1 << 20, codificacion='utf-8'):
+    '''Lee el archivo especificado por partes, mapeándolo en memoria. Un
+    caracter de varios bytes que queda partido entre dos partes se decodifica
+    completo en la siguiente.
+
+    :param ruta: la ruta del archivo, o '-' para leer la entrada estándar.
+    :param tamanno: la cantidad de bytes de cada parte.
+    :param codificacion: la codificación del archivo.
+    :returns: un generador de cadenas.'''
+
+    if ruta == '-':
+        yield from iter(lambda: sys.stdin.read(tamanno), '')
+        return
+
+    decodificador = codecs.getincrementaldecoder(codificacion)()
+    with open(ruta, 'rb') as archivo:
+        if os.fstat(archivo.fileno()).st_size == 0:
+            return    # No se puede mapear un archivo vacío.
+        with mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+            liberado = 0
+            for inicio in range(0, len(mapa), tamanno):
+                parte = mapa[inicio:inicio + tamanno]
+                # Las páginas ya leídas se liberan, para que el mapa no
+                # termine ocupando el archivo completo en memoria. madvise
+                # sólo acepta páginas completas: se liberan las que ya se
+                # leyeron por completo.
+                fin = inicio + len(parte)
+                limite = fin - fin % mmap.PAGESIZE
+                if hasattr(mmap, 'MADV_DONTNEED') and limite > liberado:
+                    mapa.madvise(mmap.MADV_DONTNEED, liberado, limite - liberado)
+                    liberado = limite
+                yield decodificador.decode(parte)
+    yield decodificador.decode(b'', final=True)
+
+def alinea_partes(partes, multiplo, relleno='x'):
+    '''Reagrupa las partes de un texto limpio de modo que la longitud de cada
+    una sea múltiplo del tamaño especificado (el tamaño de bloque de Hill o
+    de Playfair, o la longitud de la clave de Vigenère). Así cada parte se
+    puede procesar por separado sin romper un bloque ni perder la fase de la
+    clave.
+
+    :param partes: un iterable de cadenas limpias.
+    :param multiplo: el tamaño al que se alinean las partes.
+    :param relleno: la letra con la que se completa el último bloque; si es
+           None, el último bloque incompleto se devuelve tal cual.
+    :returns: un generador de cadenas.'''
+
+    pendiente = ''
+    for parte in partes:
+        parte = pendiente + parte
+        corte = len(parte) - len(parte) % multiplo
+        pendiente = parte[corte:]
+        if corte:
+            yield parte[:corte]
+    if pendiente:
+        if relleno is not None:
+            pendiente += relleno * (-len(pendiente) % multiplo)
+        yield pendiente
+
+def escribe_grupos(partes, salida, grupo=5):
+    '''Escribe el texto que llega por partes en grupos de letras separados
+    por un espacio, sin juntar antes el texto completo.
+
+    :param partes: un iterable de cadenas.
+    :param salida: el archivo (de texto) donde se escribe.
+    :param grupo: la cantidad de letras de cada grupo; 0 para no agrupar.
+    :returns: la cantidad de letras escritas.'''
+
+    escritas = 0
+    for parte in partes:
+        if not parte:
+            continue
+        if grupo <= 0:
+            salida.write(parte)
+            escritas += len(parte)
+            continue
+        # Primero se completa el grupo que quedó abierto en la parte anterior.
+        faltantes = -escritas % grupo
+        cabeza, resto = parte[:faltantes], parte[faltantes:]
+        grupos = ' '.join([resto[i:i + grupo] for i in range(0, len(resto), grupo)])
+        if grupos and escritas + len(cabeza) > 0:
+            grupos = ' ' + grupos
+        salida.write(cabeza + grupos)
+        escritas += len(parte)
+    return escritas
+
+def crea_procesador(cifrado, clave, descifrar):
+    '''Construye la función que cifra o descifra cada parte del texto con el
+    cifrado y la clave especificados.
+
+    :param cifrado: 'affine', 'vigenere', 'hill' o 'playfair'.
+    :param clave: la clave, como se recibe en la línea de comandos: 'A,B'
+           para el afín, una palabra para Vigenère y Playfair, y las entradas
+           de la matriz por renglones ('a,b,c,d' para 2x2) para Hill.
+    :param descifrar: True para descifrar, False para cifrar.
+    :returns: una tupla (funcion, multiplo), donde la función recibe una parte
+              limpia y devuelve el resultado (en mayúsculas al cifrar, en
+              minúsculas al descifrar), y multiplo es la alineación que
+              requieren las partes.
+    :raises ValueError: si la clave no es válida para el cifrado.'''
+
+    if cifrado == 'affine':
+        coeficientes = [int(x) for x in clave.replace(' ', ',').split(',') if x]
+        if len(coeficientes) != 2:
+            raise ValueError('La clave del cifrado afín debe tener la forma A,B.')
+        afin = CifradoAfin(*coeficientes)
+        if descifrar:
+            try:
+                afin.descifra('')    # Verifica que A tenga inverso módulo 26.
+            except Exception as error:
+                raise ValueError(str(error)) from error
+            return afin.descifra, 1
+        return afin.cifra, 1
+
+    if cifrado == 'vigenere':
+        palabra = limpiar_texto(clave)
+        if not palabra:
+            raise ValueError('La clave de Vigenère debe tener al menos una letra.')
+        signo = -1 if descifrar else 1
+        desplazamientos = [signo * alfabeto[c] % 26 for c in palabra]
+
+        def procesa(parte):
+            resultado = vigenere_bytes(parte.encode('ascii'), desplazamientos)
+            return (resultado if descifrar else resultado.upper()).decode('ascii')
+        return procesa, len(palabra)
+
+    if cifrado == 'hill':
+        entradas = [int(x) for x in clave.replace(' ', ',').split(',') if x]
+        n = math.isqrt(len(entradas))
+        if n == 0 or n * n != len(entradas):
+            raise ValueError('La clave de Hill debe tener N*N entradas, separadas por comas.')
+        matriz = [entradas[i:i + n] for i in range(0, n * n, n)]
+        cifrador = CifradoHill(matriz)
+        if descifrar:
+            try:
+                cifrador.inversa = matriz_inversa_mod26(cifrador.matriz)
+            except Exception as error:
+                raise ValueError(str(error)) from error
+            return (lambda parte: cifrador.descifra(parte).lower()), n
+        return cifrador.cifra, n
+
+    if cifrado == 'playfair':
+        cuadro = CuadroPlayfair(construye_cuadro(limpiar_texto(clave)))
+        return (cuadro.descifra if descifrar else cuadro.cifra), 2
+
+    raise ValueError('Cifrado desconocido: ' + cifrado)
+
+def procesa_archivo(entrada, salida, cifrado, clave, descifrar=False, grupo=5,
+                    tamanno=1 << 20, enne='nn'):
+    '''Cifra o descifra el archivo de entrada por partes y escribe el
+    resultado en grupos de letras.
+
+    :param entrada: la ruta del archivo de entrada, o '-'.
+    :param salida: el archivo (de texto) donde se escribe el resultado.
+    :param cifrado: el cifrado a usar (ver crea_procesador).
+    :param clave: la clave del cifrado (ver crea_procesador).
+    :param descifrar: True para descifrar, False para cifrar.
+    :param grupo: la cantidad de letras de cada grupo de la salida.
+    :param tamanno: la cantidad de bytes que se leen en cada parte.
+    :param enne: la cadena por la que se sustituye la ñ al limpiar.
+    :returns: la cantidad de letras escritas.'''
+
+    funcion, multiplo = crea_procesador(cifrado, clave, descifrar)
+    limpias = limpiar_partes(partes_archivo(entrada, tamanno), enne)
+    # Sólo los cifrados por bloques (Hill y Playfair) rellenan el último
+    # bloque al cifrar; un criptograma ya viene completo.
+    relleno = 'x' if cifrado in ('hill', 'playfair') and not descifrar else None
+    alineadas = alinea_partes(limpias, multiplo, relleno)
+    return escribe_grupos(map(funcion, alineadas), salida, grupo)
+
+def main(argumentos=None):
+    '''Punto de entrada de la línea de comandos.
+
+    :param argumentos: la lista de argumentos; por omisión, sys.argv.'''
+
+    parser = argparse.ArgumentParser(
+        prog='python3 -m clasicos',
+        description='Cifra o descifra un archivo con un cifrado clásico.')
+    parser.add_argument('operacion', choices=['encrypt', 'decrypt'])
+    parser.add_argument('entrada', help="el archivo de entrada ('-' para la entrada estándar)")
+    parser.add_argument('--cipher', required=True, dest='cifrado',
+                        choices=['affine', 'vigenere', 'hill', 'playfair'])
+    parser.add_argument('--clave', '--key', required=True,
+                        help="'A,B' para el afín, una palabra para Vigenère y Playfair, "
+                             "las entradas de la matriz por renglones para Hill")
+    parser.add_argument('-o', '--salida', default='-',
+                        help="el archivo de salida ('-' para la salida estándar)")
+    parser.add_argument('--grupo', type=int, default=5,
+                        help='letras por grupo en la salida (0 para no agrupar)')
+    parser.add_argument('--tamanno', type=int, default=1 << 20,
+                        help='bytes que se procesan en cada parte')
+    parser.add_argument('--enne', default='nn', help='sustituto de la ñ')
+    args = parser.parse_args(argumentos)
+
+    try:
+        crea_procesador(args.cifrado, args.clave, args.operacion == 'decrypt')
+    except ValueError as error:
+        parser.error(str(error))
+
+    if args.salida == '-':
+        procesa_archivo(args.entrada, sys.stdout, args.cifrado, args.clave,
+                        args.operacion == 'decrypt', args.grupo, args.tamanno, args.enne)
+        sys.stdout.write('\n')
+    else:
+        with open(args.salida, 'w') as salida:
+            procesa_archivo(args.entrada, salida, args.cifrado, args.clave,
+                            args.operacion == 'decrypt', args.grupo, args.tamanno, args.enne)
+
+if __name__ == '__main__':
+    main()
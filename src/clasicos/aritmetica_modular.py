@@ -0,0 +1,229 @@
+'''
+Funciones de aritmética modular compartidas por los cifrados clásicos y por
+las curvas elípticas (ecc.py): reducción, máximo común divisor, inversos,
+símbolo de Legendre, raíces cuadradas, teorema chino del residuo y prueba de
+primalidad de Miller-Rabin.
+'''
+
+import random
+from functools import lru_cache
+
+__all__ = ['reduce_mod', 'mcd', 'euclides_extendido', 'inverso_mod', 'tabla_inversos',
+           'simbolo_legendre', 'raiz_cuadrada_mod', 'teorema_chino',
+           'testigo_miller_rabin', 'es_primo_probable', 'inversos_26',
+           'limite_primos_pequennos', 'primos_pequennos', 'bases_miller_rabin',
+           'cota_miller_rabin']
+
+# ------------------------------------------------------------------------------
+# --                              FUNCIONES                                   --
+# ------------------------------------------------------------------------------
+
+def reduce_mod(a, m):
+    '''Obtiene el representante de A módulo M en el intervalo [0, M). Para A
+    negativo el operador % de Python ya devuelve un valor no negativo, así
+    que la reducción no depende del tamaño de A.
+
+    :param a: un entero.
+    :param m: el módulo, un entero positivo.
+    :returns: el entero x, 0 <= x < m, que satisface a = x (mod m).'''
+
+    return a % m
+
+def mcd(a, b):
+    '''Devuelve el máximo común divisor de los valores especificados usando el
+    algoritmo de Euclides de manera iterativa.
+
+    :param a: el primer valor para calcular el MCD.
+    :param b: el segundo valor para calcular el MCD.
+    :returns: el MCD entre a y b.'''
+
+    while b != 0:
+        a, b = b, a % b
+    return a
+
+def euclides_extendido(a, b):
+    '''Algoritmo extendido de Euclides, de manera iterativa.
+
+    :param a: un entero.
+    :param b: un entero.
+    :returns: una tupla (g, x, y) con g = mcd(a, b) y a*x + b*y = g.'''
+
+    x0, x1, y0, y1 = 1, 0, 0, 1
+    while b != 0:
+        q = a // b
+        a, b = b, a - q * b
+        x0, x1 = x1, x0 - q * x1
+        y0, y1 = y1, y0 - q * y1
+    return a, x0, y0
+
+def inverso_mod(a, m):
+    '''Obtiene el inverso multiplicativo de A módulo M con pow, que usa el
+    algoritmo extendido de Euclides. Para los módulos con tabla de inversos
+    (ver tabla_inversos) conviene consultar la tabla directamente.
+
+    :param a: el valor para el que se busca el inverso multiplicativo.
+    :param m: el módulo, un entero positivo.
+    :returns: el inverso multiplicativo de A, módulo M.
+    :raises ValueError: si A no es primo relativo con M.'''
+
+    try:
+        return pow(a, -1, m)
+    except ValueError:
+        raise ValueError(f'El valor no tiene inverso módulo {m}.') from None
+
+@lru_cache(maxsize=None)
+def tabla_inversos(m):
+    '''Construye la tabla de inversos módulo M: la entrada A es el inverso
+    de A, o None si A no tiene inverso. Sólo tiene sentido para módulos
+    pequeños; la tabla de cada módulo se construye una sola vez.
+
+    :param m: el módulo, un entero positivo.
+    :returns: una tupla de longitud M.'''
+
+    return tuple(pow(a, -1, m) if mcd(a, m) == 1 else None for a in range(m))
+
+def simbolo_legendre(a, p):
+    '''Calcula el símbolo de Legendre de A módulo P con el criterio de Euler:
+    A^((P - 1) / 2) es 1 si A es residuo cuadrático y P - 1 si no lo es.
+
+    :param a: un entero.
+    :param p: un número primo.
+    :returns: 0 si P divide a A, 1 si A es residuo cuadrático módulo P y -1 en
+              otro caso.'''
+
+    a = a % p
+    if a == 0:
+        return 0
+    if p == 2:
+        return 1
+    return 1 if pow(a, (p - 1) // 2, p) == 1 else -1
+
+def raiz_cuadrada_mod(a, p):
+    '''Obtiene una raíz cuadrada de A módulo el primo P con el algoritmo de
+    Tonelli-Shanks.
+
+    :param a: un residuo cuadrático módulo P.
+    :param p: un número primo.
+    :returns: la menor de las dos raíces cuadradas de A módulo P.
+    :raises ValueError: si A no es residuo cuadrático módulo P.'''
+
+    a = a % p
+    if a == 0 or p == 2:
+        return a
+    if simbolo_legendre(a, p) != 1:
+        raise ValueError('El valor no es residuo cuadrático módulo p.')
+    if p % 4 == 3:
+        raiz = pow(a, (p + 1) // 4, p)
+    else:
+        # p - 1 = q * 2^s, con q impar.
+        q, s = p - 1, 0
+        while q % 2 == 0:
+            q //= 2
+            s += 1
+        z = 2
+        while simbolo_legendre(z, p) != -1:
+            z += 1
+        m, c, t, raiz = s, pow(z, q, p), pow(a, q, p), pow(a, (q + 1) // 2, p)
+        while t != 1:
+            # El menor i tal que t^(2^i) = 1.
+            i, t2 = 0, t
+            while t2 != 1:
+                t2 = t2 * t2 % p
+                i += 1
+            b = pow(c, 1 << (m - i - 1), p)
+            m, c, t, raiz = i, b * b % p, t * b * b % p, raiz * b % p
+    return min(raiz, p - raiz)
+
+def teorema_chino(residuos, modulos):
+    '''Resuelve el sistema de congruencias x = residuos[i] (mod modulos[i]),
+    con módulos primos entre sí, por el teorema chino del residuo.
+
+    :param residuos: la lista de residuos.
+    :param modulos: la lista de módulos, primos entre sí.
+    :returns: la única solución x con 0 <= x < producto de los módulos.'''
+
+    x, m = 0, 1
+    for r, n in zip(residuos, modulos):
+        # x + m * t = r (mod n)
+        t = (r - x) * inverso_mod(m, n) % n if n > 1 else 0
+        x, m = x + m * t, m * n
+    return x % m
+
+def testigo_miller_rabin(n, base, d, s):
+    '''Aplica una ronda de Miller-Rabin a N con la base especificada, donde
+    N - 1 = D * 2^S con D impar.
+
+    :param n: un entero impar mayor que 2.
+    :param base: la base de la ronda, 2 <= base < N.
+    :param d: la parte impar de N - 1.
+    :param s: el exponente de 2 en N - 1.
+    :returns: True si la base demuestra que N es compuesto, False en otro
+              caso.'''
+
+    x = pow(base, d, n)
+    if x == 1 or x == n - 1:
+        return False
+    for _ in range(s - 1):
+        x = x * x % n
+        if x == n - 1:
+            return False
+    return True
+
+def es_primo_probable(n, rondas=16, semilla=None):
+    '''Determina si N es primo con la prueba de Miller-Rabin. Primero se
+    descarta N si lo divide alguno de los primos pequeños (ver
+    primos_pequennos). Para N menor que cota_miller_rabin la prueba con los
+    primos hasta 37 como bases es determinista; para N mayor se agregan
+    rondas con bases aleatorias, y la probabilidad de aceptar un compuesto es
+    a lo más 4^(-rondas).
+
+    :param n: un entero.
+    :param rondas: la cantidad de bases aleatorias que se prueban cuando N es
+           mayor o igual que cota_miller_rabin.
+    :param semilla: la semilla de las bases aleatorias.
+    :returns: True si N es primo (o, para N muy grande, probablemente primo),
+              False en otro caso.'''
+
+    if n < 2:
+        return False
+    for p in primos_pequennos:
+        if n % p == 0:
+            return n == p
+    if n < limite_primos_pequennos ** 2:
+        return True
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    if any(testigo_miller_rabin(n, base, d, s) for base in bases_miller_rabin):
+        return False
+    if n < cota_miller_rabin:
+        return True
+    rnd = random.Random(semilla)
+    return not any(testigo_miller_rabin(n, rnd.randrange(2, n - 1), d, s)
+                   for _ in range(rondas))
+
+# ------------------------------------------------------------------------------
+# --                              CONSTANTES                                  --
+# ------------------------------------------------------------------------------
+
+# Los inversos módulo 26 que usan los cifrados afín y de Hill, calculados al
+# importar el módulo.
+inversos_26 = tabla_inversos(26)
+
+# Los primos menores que limite_primos_pequennos, obtenidos con una criba, con
+# los que es_primo_probable descarta la mayoría de los compuestos antes de
+# Miller-Rabin.
+limite_primos_pequennos = 1000
+_criba = bytearray([1]) * limite_primos_pequennos
+_criba[0] = _criba[1] = 0
+for _p in range(2, 32):
+    if _criba[_p]:
+        _criba[_p * _p::_p] = bytes(len(range(_p * _p, limite_primos_pequennos, _p)))
+primos_pequennos = tuple(i for i, primo in enumerate(_criba) if primo)
+del _criba, _p
+
+# Con los primos hasta 37 como bases, Miller-Rabin es determinista para todo N
+# menor que esta cota (mayor que 2^64).
+bases_miller_rabin = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+cota_miller_rabin = 318665857834031151167461
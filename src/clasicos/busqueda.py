@@ -0,0 +1,181 @@
+'''
+Ejecución en paralelo de las búsquedas de claves (fuerza bruta de Hill y
+recocido simulado de Playfair), repartiendo el espacio de claves o los
+reinicios entre varios procesos.
+'''
+
+import multiprocessing
+import os
+from array import array
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+
+from hill import *
+from playfair import *
+
+# Datos de la búsqueda (el criptograma o lo que se precalcula a partir de
+# él) compartidos por el proceso principal. Cada proceso de trabajo los lee
+# una sola vez de la memoria compartida, al iniciar.
+datos_compartidos = None
+
+# Evento con el que el proceso principal pide a los procesos de trabajo que
+# terminen en cuanto se alcanza el umbral.
+detener_compartido = None
+
+def adjunta_datos(nombre, longitud, lee, detener):
+    '''Inicializador de los procesos de trabajo: lee los datos de la búsqueda
+    de la memoria compartida y guarda el evento para detener la búsqueda.
+
+    :param nombre: el nombre del bloque de memoria compartida.
+    :param longitud: la cantidad de bytes de los datos.
+    :param lee: la función que reconstruye los datos a partir de sus bytes.
+    :param detener: el evento (multiprocessing.Event) que se activa al
+           alcanzar el umbral.'''
+
+    global datos_compartidos, detener_compartido
+    memoria = shared_memory.SharedMemory(name=nombre)
+    datos_compartidos = lee(bytes(memoria.buf[:longitud]))
+    memoria.close()
+    detener_compartido = detener
+
+def ejecuta_busqueda(datos, lee, funcion, tareas, k=10, mayor_es_mejor=True,
+                     umbral=None, procesos=None):
+    '''Ejecuta las tareas especificadas en un conjunto de procesos y combina
+    sus resultados. Los datos de la búsqueda se copian una sola vez a memoria
+    compartida, en lugar de enviarse con cada tarea, y cada proceso los
+    reconstruye una sola vez.
+
+    :param datos: los bytes sobre los que trabajan las tareas (el criptograma
+           o lo que se precalcula a partir de él).
+    :param lee: la función que reconstruye los datos a partir de sus bytes en
+           cada proceso de trabajo; debe poder enviarse a otro proceso (una
+           función de módulo).
+    :param funcion: la función que ejecuta cada tarea; recibe los datos
+           reconstruidos y los argumentos de la tarea, y devuelve una lista de
+           tuplas cuyo primer elemento es el puntaje.
+    :param tareas: una lista de tuplas con los argumentos de cada tarea.
+    :param k: la cantidad de resultados a devolver.
+    :param mayor_es_mejor: True si un puntaje mayor es mejor, False si un
+           puntaje menor es mejor.
+    :param umbral: si se especifica, la búsqueda se detiene en cuanto algún
+           resultado alcanza este puntaje: las tareas pendientes se cancelan,
+           las que ya esperan en un proceso terminan sin hacer nada y las que
+           están corriendo se detienen (ver detener_compartido).
+    :param procesos: la cantidad de procesos a usar. Por omisión, la cantidad
+           de procesadores.
+    :returns: una lista con los K mejores resultados de todas las tareas.'''
+
+    memoria = shared_memory.SharedMemory(create=True, size=max(len(datos), 1))
+    memoria.buf[:len(datos)] = datos
+    signo = 1 if mayor_es_mejor else -1
+    detener = multiprocessing.Event()
+    resultados = []
+    ejecutor = ProcessPoolExecutor(max_workers=procesos or os.cpu_count(),
+                                   initializer=adjunta_datos,
+                                   initargs=(memoria.name, len(datos), lee, detener))
+    try:
+        pendientes = {ejecutor.submit(ejecuta_tarea, funcion, tarea) for tarea in tareas}
+        while pendientes:
+            terminadas, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+            for futuro in terminadas:
+                resultados.extend(futuro.result())
+            resultados = heapq.nlargest(k, resultados, key=lambda r: signo * r[0])
+            if (umbral is not None and resultados
+                    and signo * resultados[0][0] >= signo * umbral):
+                break
+    finally:
+        # Al salir del ejecutor se espera a las tareas que ya están en los
+        # procesos; con el evento activado terminan de inmediato.
+        detener.set()
+        ejecutor.shutdown(wait=True, cancel_futures=True)
+        memoria.close()
+        memoria.unlink()
+    return resultados
+
+def ejecuta_tarea(funcion, argumentos):
+    '''Ejecuta una tarea en un proceso de trabajo, sobre los datos
+    compartidos.
+
+    :param funcion: la función de la tarea.
+    :param argumentos: los argumentos de la tarea.
+    :returns: el resultado de la función, o una lista vacía si la búsqueda
+              ya se detuvo.'''
+
+    if detener_compartido.is_set():
+        return []
+    return funcion(datos_compartidos, *argumentos)
+
+# ------------------------------------------------------------------------------
+# --                               TAREAS                                     --
+# ------------------------------------------------------------------------------
+
+def lee_histogramas(datos):
+    '''Reconstruye los histogramas de los renglones de Hill (ver
+    histogramas_filas) a partir de los bytes compartidos por
+    descifrado_hill_paralelo.'''
+
+    conteos = array('q')
+    conteos.frombytes(datos)
+    return [conteos[i:i + 26].tolist() for i in range(0, len(conteos), 26)]
+
+def lee_texto(datos):
+    '''Reconstruye el criptograma a partir de sus bytes en UTF-8.'''
+
+    return datos.decode('utf-8')
+
+def tarea_hill(histogramas, primeros, k, criterio):
+    '''Prueba las matrices de Hill de 2x2 cuyos primeros renglones de
+    descifrado están en el rango especificado.'''
+
+    return descifrado_hill_histogramas(histogramas, k, criterio, primeros)
+
+def tarea_playfair(criptograma, semilla, iteraciones, temperatura):
+    '''Ejecuta una corrida de recocido simulado de Playfair.'''
+
+    puntaje, cuadro, texto, _ = rompe_playfair(criptograma, 1, iteraciones,
+                                               temperatura, semilla, detener_compartido)
+    return [(puntaje, cuadro, texto)]
+
+# ------------------------------------------------------------------------------
+# --                             BUSQUEDAS                                    --
+# ------------------------------------------------------------------------------
+
+def descifrado_hill_paralelo(s, k=10, criterio='ic', umbral=None, procesos=None):
+    '''Fuerza bruta de Hill de 2x2 (ver descifrado_hill_por_lotes) repartida
+    entre varios procesos según el primer renglón de la matriz de descifrado.
+
+    :param s: el texto cifrado con el sistema de Hill.
+    :param k: la cantidad de matrices a devolver.
+    :param criterio: 'ic' o 'chi', como en descifrado_hill_por_lotes.
+    :param umbral: el puntaje con el que se detiene la búsqueda.
+    :param procesos: la cantidad de procesos a usar.
+    :returns: una lista con las K mejores tuplas (puntaje, matriz).'''
+
+    # Los digramas se cuentan una sola vez, aquí, y los procesos reciben los
+    # histogramas de los renglones en lugar del criptograma.
+    histogramas = histogramas_filas(conteo_digramas(s))
+    datos = array('q', [f for h in histogramas for f in h]).tobytes()
+    partes = 4 * (procesos or os.cpu_count())
+    tareas = [(range(i, 676, partes), k, criterio) for i in range(partes)]
+    return ejecuta_busqueda(datos, lee_histogramas, tarea_hill, tareas, k, criterio == 'ic',
+                            umbral, procesos)
+
+def rompe_playfair_paralelo(criptograma, reinicios=8, iteraciones=100000,
+                            temperatura=40, umbral=None, procesos=None, semilla=0):
+    '''Recocido simulado de Playfair (ver rompe_playfair) con los reinicios
+    repartidos entre varios procesos. Cada reinicio usa la semilla SEMILLA + i,
+    de modo que la búsqueda es reproducible.
+
+    :param criptograma: el texto cifrado con Playfair.
+    :param reinicios: la cantidad de corridas de recocido.
+    :param iteraciones: la cantidad de iteraciones de cada corrida.
+    :param temperatura: la temperatura inicial de cada corrida.
+    :param umbral: el puntaje con el que se detiene la búsqueda.
+    :param procesos: la cantidad de procesos a usar.
+    :param semilla: la semilla de la primera corrida.
+    :returns: una lista de tuplas (puntaje, cuadro, texto descifrado),
+              ordenada de mejor a peor.'''
+
+    tareas = [(semilla + i, iteraciones, temperatura) for i in range(reinicios)]
+    return ejecuta_busqueda(criptograma.encode('utf-8'), lee_texto, tarea_playfair, tareas,
+                            reinicios, True, umbral, procesos)
@@ -57,6 +57,9 @@ print('Ordenadas de mayor a menor frecuencia:\n', sorted(frec_cript1, key = frec
 print('Índice de coincidencias texto plano: ', polialfabetico.indice_coincidencias(texto_plano1))
 print('Índice de coincidencias texto cifrado (monoalfabetico): ', polialfabetico.indice_coincidencias(cifrado_mono))
 
+mejores_afines, _ = monoalfabetico.descifrado_afin_por_puntaje(cifrado_mono, 1)
+print('Función afín recuperada a partir del texto cifrado (A, B):', mejores_afines[0][1])
+
 # ------------------------------------------------------------------------------
 # --                       CIFRADO POLIALFABETICO                             --
 # ------------------------------------------------------------------------------
@@ -89,21 +92,24 @@ print('Ordenadas de mayor a menor frecuencia:\n', sorted(frec_cript2, key = frec
 print('Índice de coincidencias texto plano: ', polialfabetico.indice_coincidencias(texto_plano2))
 print('Índice de coincidencias texto cifrado (polialfabetico): ', polialfabetico.indice_coincidencias(cifrado_poli), '\n')
 
-# Se obtiene un extracto de los textos, debido a que los algoritmos para
-# calcular los factores de las distancias toman mucho tiempo.
-texto_plano_extracto = texto_plano2[0:1500]
-texto_cifrado_extracto = cifrado_poli[0:1500]
-
-reps_plano = polialfabetico.repetidas(texto_plano_extracto)
-pos_plano = polialfabetico.repetidas_pos(texto_plano_extracto, reps_plano)
+reps_plano = polialfabetico.repetidas(texto_plano2)
+pos_plano = polialfabetico.repetidas_pos(texto_plano2, reps_plano)
 difs_plano = polialfabetico.repetidas_difs(pos_plano)
 facts_plano = polialfabetico.factores_difs(difs_plano)
 print('Los factores de las distancias en el texto plano son:')
 imprime_diccionario(facts_plano)
 
-reps_cript = polialfabetico.repetidas(texto_cifrado_extracto)
-pos_cript = polialfabetico.repetidas_pos(texto_cifrado_extracto, reps_cript)
+reps_cript = polialfabetico.repetidas(cifrado_poli)
+pos_cript = polialfabetico.repetidas_pos(cifrado_poli, reps_cript)
 difs_cript = polialfabetico.repetidas_difs(pos_cript)
 facts_cript = polialfabetico.factores_difs(difs_cript)
 print('\nLos factores de las distancias en el texto cifrado son:')
 imprime_diccionario(facts_cript)
+
+mcd_cript, divisores_cript = polialfabetico.resumen_distancias(difs_cript)
+print('\nMáximo común divisor de las distancias en el texto cifrado:', mcd_cript)
+print('Distancias que son múltiplo de cada posible longitud de clave:')
+imprime_diccionario(divisores_cript)
+
+clave_recuperada, _ = polialfabetico.romper_vigenere(cifrado_poli)
+print('\nClave recuperada a partir del texto cifrado:', clave_recuperada)
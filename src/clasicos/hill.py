@@ -1,5 +1,13 @@
+import heapq
+import itertools
+import operator
+from fractions import Fraction
+from functools import lru_cache
+
+from aritmetica_modular import inversos_26
 from monoalfabetico import *
 from polialfabetico import *
+from ngramas import *
 
 def separa_grafias(s, n):
     '''Separa el texto especificado S en grafias de longitud N. Se asume
@@ -22,17 +30,7 @@ def cifrado_hill(a, b, c, d, s):
     :param s: el texto a cifrar con la matriz de cifrado.
     :returns: el texto cifrado con el sistema de Hill.'''
 
-    grafias = separa_grafias(s.replace(' ', '').lower(), 2)
-    cifradas = []
-    for graf in grafias:
-        if graf[0] in alfabeto and graf[1] in alfabeto:
-            val_a = alfabeto[graf[0]]
-            val_b = alfabeto[graf[1]]
-            coord_1 = congruente_mod26((a * val_a) + (b * val_b))
-            coord_2 = congruente_mod26((c * val_a) + (d * val_b))
-            cifradas.append(alfabeto_inverso[coord_1]
-                            + alfabeto_inverso[coord_2])
-    return ''.join(cifradas)
+    return hill_compilado(((a, b), (c, d))).cifra(s)
 
 def descifrado_hill(a, b, c, d, s):
     '''Descifra el texto especificado, a partir de la matriz de cifrado
@@ -46,8 +44,7 @@ def descifrado_hill(a, b, c, d, s):
               especificada.
     :returns: el texto descifrado en claro.'''
 
-    a_inv, b_inv, c_inv, d_inv = matriz_inversa(a, b, c, d)
-    return cifrado_hill(a_inv, b_inv, c_inv, d_inv, s)
+    return hill_compilado(((a, b), (c, d))).descifra(s)
 
 def matriz_inversa(a, b, c, d):
     '''Obtiene la matriz inversa de la matriz especificada si exsite, en los
@@ -73,6 +70,137 @@ def matriz_inversa(a, b, c, d):
             congruente_mod26(inv_det * (-c)),
             congruente_mod26(inv_det * a))
 
+def matriz_inversa_mod26(matriz):
+    '''Obtiene la matriz inversa módulo 26 de una matriz cuadrada de
+    cualquier tamaño, si existe. Se calcula la inversa sobre los racionales
+    por eliminación de Gauss-Jordan; multiplicada por el determinante se
+    obtiene la adjunta, que es entera, y basta multiplicarla por el inverso
+    del determinante módulo 26.
+
+    :param matriz: una lista de renglones de la matriz (n listas de n enteros).
+    :returns: una tupla de renglones (tuplas) con la matriz inversa módulo 26,
+              si existe.'''
+
+    n = len(matriz)
+    aumentada = [[Fraction(x) for x in renglon] + [Fraction(int(i == j)) for j in range(n)]
+                 for i, renglon in enumerate(matriz)]
+    det = Fraction(1)
+    for col in range(n):
+        pivote = next((r for r in range(col, n) if aumentada[r][col] != 0), None)
+        if pivote is None:
+            # Determinante cero: la matriz no tiene inversa.
+            raise Exception('La matriz no es invertible módulo 26.')
+        if pivote != col:
+            aumentada[col], aumentada[pivote] = aumentada[pivote], aumentada[col]
+            det = -det
+        valor = aumentada[col][col]
+        det *= valor
+        aumentada[col] = [x / valor for x in aumentada[col]]
+        for r in range(n):
+            if r != col and aumentada[r][col] != 0:
+                factor = aumentada[r][col]
+                aumentada[r] = [x - factor * y for x, y in zip(aumentada[r], aumentada[col])]
+
+    inv_det = inverso(congruente_mod26(int(det)))    # Puede lanzar una excepcion.
+    return tuple(tuple(congruente_mod26(int(x * det) * inv_det) for x in renglon[n:])
+                 for renglon in aumentada)
+
+def determinante(matriz):
+    '''Calcula el determinante de una matriz cuadrada de enteros con el
+    algoritmo de Bareiss, cuyas divisiones son exactas, de modo que todos los
+    valores intermedios son enteros.
+
+    :param matriz: una lista de renglones de la matriz (n listas de n enteros).
+    :returns: el determinante de la matriz, como entero.'''
+
+    n = len(matriz)
+    m = [list(renglon) for renglon in matriz]
+    signo, previo = 1, 1
+    for col in range(n - 1):
+        if m[col][col] == 0:
+            pivote = next((r for r in range(col + 1, n) if m[r][col] != 0), None)
+            if pivote is None:
+                return 0
+            m[col], m[pivote] = m[pivote], m[col]
+            signo = -signo
+        for r in range(col + 1, n):
+            for c in range(col + 1, n):
+                m[r][c] = (m[r][c] * m[col][col] - m[r][col] * m[col][c]) // previo
+        previo = m[col][col]
+    return signo * m[n - 1][n - 1]
+
+class CifradoHill:
+    '''Cifrado de Hill con una matriz de NxN. La matriz inversa módulo 26 se
+    calcula una sola vez, la primera vez que se descifra. El texto completo se
+    cifra como un solo producto de la matriz por los bloques del texto (ver
+    producto_bloques), sin separar el texto en grafías.'''
+
+    def __init__(self, matriz):
+        '''Inicializa el cifrado con la matriz de cifrado especificada.
+
+        :param matriz: la matriz de cifrado, como una lista de N renglones de
+               N enteros.'''
+
+        self.matriz = tuple(tuple(congruente_mod26(x) for x in renglon) for renglon in matriz)
+        self.n = len(self.matriz)
+        self.inversa = None
+
+    def cifra(self, s):
+        '''Cifra el texto especificado. Se omiten los espacios y los bloques
+        con caracteres fuera del alfabeto.
+
+        :param s: el texto a cifrar.
+        :returns: el texto cifrado, en mayúsculas.'''
+
+        valores = valores_hill(s, self.n)
+        return producto_bloques(valores, self.matriz).translate(tabla_letras).decode('ascii')
+
+    def descifra(self, s):
+        '''Descifra el texto especificado, cifrado con esta matriz.
+
+        :param s: el texto cifrado.
+        :returns: el texto descifrado, en mayúsculas.'''
+
+        if self.inversa is None:
+            self.inversa = matriz_inversa_mod26(self.matriz)    # Puede lanzar una excepcion.
+        valores = valores_hill(s, self.n)
+        return producto_bloques(valores, self.inversa).translate(tabla_letras).decode('ascii')
+
+@lru_cache(maxsize=1024)
+def hill_compilado(matriz):
+    '''Devuelve el cifrado de Hill para la matriz especificada, reutilizando
+    el de llamadas anteriores (y con él su matriz inversa).
+
+    :param matriz: la matriz de cifrado, como una tupla de renglones.
+    :returns: un objeto CifradoHill para la matriz.'''
+
+    return CifradoHill(matriz)
+
+def producto_bloques(valores, matriz):
+    '''Multiplica la matriz especificada por cada bloque de N valores del
+    texto, todos a la vez: cada renglón de la matriz se aplica a las columnas
+    completas del texto con aplica_renglon.
+
+    :param valores: los valores del texto, como los devuelve valores_hill.
+    :param matriz: una matriz de NxN con entradas entre 0 y 25.
+    :returns: un objeto bytes con los valores (0 a 25) del texto resultante.'''
+
+    n = len(matriz)
+    longitud = len(valores) // n
+    columnas = [valores[i::n] for i in range(n)]
+    # Sólo se calculan los productos de cada columna por los coeficientes que
+    # aparecen en la matriz.
+    productos = [{} for _ in range(n)]
+    for renglon in matriz:
+        for i, coef in enumerate(renglon):
+            if coef not in productos[i]:
+                productos[i][coef] = int.from_bytes(columnas[i].translate(tablas_producto[coef]), 'big')
+
+    resultado = bytearray(len(valores))
+    for i, renglon in enumerate(matriz):
+        resultado[i::n] = aplica_renglon(productos, renglon, longitud)
+    return bytes(resultado)
+
 def descifrado_hill_fuerza_bruta(s):
     '''Prueba todas las combinaciones de matrices de cifrado para intentar
     descifrar el texto especificado S. Luego de probar todas las
@@ -116,4 +244,204 @@ def descifrado_hill_fuerza_bruta(s):
       for ic, i, m, t in textos:
         f.write(str(i) + '; ' + str(ic) + '; ' + m + '; ' + t + '\n')
 
+def conteo_digramas(s):
+    '''Cuenta las apariciones de cada digrama del texto especificado,
+    representando cada letra por su valor numérico. Igual que en cifrado_hill,
+    se omiten los espacios y los digramas con caracteres fuera del alfabeto.
+
+    :param s: el texto del que se contarán los digramas.
+    :returns: un diccionario que asocia cada par (x, y) de valores numéricos
+              con la cantidad de veces que aparece como digrama.'''
+
+    conteo = {}
+    for graf in separa_grafias(s.replace(' ', '').lower(), 2):
+        if len(graf) == 2 and graf[0] in alfabeto and graf[1] in alfabeto:
+            par = (alfabeto[graf[0]], alfabeto[graf[1]])
+            conteo[par] = conteo.get(par, 0) + 1
+    return conteo
+
+def histogramas_filas(conteo):
+    '''Calcula, para cada uno de los 676 renglones (u, v) posibles de una
+    matriz de descifrado, los conteos de las letras que produce al aplicarse
+    a todos los digramas del texto. Cada renglón de la matriz determina una
+    sola letra de cada digrama descifrado, de modo que el histograma del texto
+    descifrado con la matriz de renglones r1 y r2 es la suma de los
+    histogramas de r1 y r2.
+
+    :param conteo: el conteo de digramas, como lo devuelve conteo_digramas.
+    :returns: una lista de 676 listas de 26 conteos; el renglón (u, v) está en
+              el índice 26 * u + v.'''
+
+    histogramas = []
+    for u in range(0, 26):
+        for v in range(0, 26):
+            hist = [0] * 26
+            for (x, y), veces in conteo.items():
+                hist[(u * x + v * y) % 26] += veces
+            histogramas.append(hist)
+    return histogramas
+
+def descifrado_hill_por_lotes(s, k=10, criterio='ic', primeros=range(0, 676)):
+    '''Prueba todas las matrices de descifrado de 2x2 sobre el texto
+    especificado S sin descifrarlo con cada una. Los digramas se cuentan una
+    sola vez y el histograma de letras de cada intento se obtiene sumando los
+    histogramas de sus dos renglones, de modo que el índice de coincidencias
+    y la chi cuadrada se reducen a productos punto de 26 entradas.
+
+    :param s: el texto cifrado con el sistema de Hill.
+    :param k: la cantidad de matrices a devolver.
+    :param criterio: 'ic' para ordenar por índice de coincidencias (de mayor a
+           menor) o 'chi' para ordenar por chi cuadrada contra el español (de
+           menor a mayor).
+    :param primeros: los índices (26 * u + v) de los primeros renglones de
+           las matrices de descifrado a probar; permite repartir la búsqueda.
+    :returns: una lista con las K mejores tuplas (puntaje, matriz), donde
+              matriz es la tupla (a, b, c, d) de la matriz de cifrado, que
+              puede usarse directamente con descifrado_hill.'''
+
+    return descifrado_hill_histogramas(histogramas_filas(conteo_digramas(s)), k, criterio,
+                                       primeros)
+
+def descifrado_hill_histogramas(histogramas, k=10, criterio='ic', primeros=range(0, 676)):
+    '''Búsqueda de descifrado_hill_por_lotes a partir de los histogramas de
+    los renglones ya calculados, de modo que varias búsquedas sobre el mismo
+    texto (por ejemplo, una por cada parte de los primeros renglones) no
+    vuelven a contar los digramas.
+
+    :param histogramas: los histogramas de los 676 renglones, como los
+           devuelve histogramas_filas.
+    :param k: la cantidad de matrices a devolver.
+    :param criterio: 'ic' o 'chi', como en descifrado_hill_por_lotes.
+    :param primeros: los índices (26 * u + v) de los primeros renglones de
+           las matrices de descifrado a probar.
+    :returns: una lista con las K mejores tuplas (puntaje, matriz), como en
+              descifrado_hill_por_lotes.'''
+
+    # Cada renglón asigna una letra a cada digrama, así que cualquier
+    # histograma suma la cantidad de digramas.
+    longitud = 2 * sum(histogramas[0])
+
+    if criterio == 'ic':
+        # sum((hu + hv)^2) = sum(hu^2) + sum(hv^2) + 2 * (hu . hv)
+        pesos = histogramas
+        propios = [sum(f * f for f in h) for h in histogramas]
+        normal = longitud * (longitud - 1)
+        puntua = lambda cuadrados: (cuadrados - longitud) / normal
+        mejores = heapq.nlargest
+    elif criterio == 'chi':
+        # sum((hu + hv - e)^2 / e) = sum(hu^2 / e) + sum(hv^2 / e)
+        #                            + 2 * (hu . hv / e) - longitud
+        esperados = [longitud * p for p in probabilidades_espannol]
+        pesos = [[f / e for f, e in zip(h, esperados)] for h in histogramas]
+        propios = [sum(f * w for f, w in zip(h, ws)) for h, ws in zip(histogramas, pesos)]
+        puntua = lambda cuadrados: cuadrados - longitud
+        mejores = heapq.nsmallest
+    else:
+        raise ValueError('El criterio debe ser \'ic\' o \'chi\'.')
+
+    def intentos():
+        for r1 in primeros:
+            u1, v1 = divmod(r1, 26)
+            h1 = histogramas[r1]
+            for r2 in range(0, 676):
+                u2, v2 = divmod(r2, 26)
+                if (u1 * v2 - v1 * u2) % 26 in coprimos_26:
+                    cruzado = sum(map(operator.mul, h1, pesos[r2]))
+                    yield (puntua(propios[r1] + propios[r2] + 2 * cruzado), (u1, v1, u2, v2))
+
+    return [(puntaje, matriz_inversa(*inversa))
+            for puntaje, inversa in mejores(k, intentos(), key=lambda t: t[0])]
+
+def valores_hill(s, n):
+    '''Convierte el texto especificado en bytes con los valores numéricos de
+    sus letras, separado en bloques de N. Igual que en cifrado_hill, se omiten
+    los espacios y los bloques con caracteres fuera del alfabeto.
+
+    :param s: el texto a convertir.
+    :param n: el tamaño de los bloques.
+    :returns: un objeto bytes con los valores (0 a 25) de los bloques
+              completos del texto.'''
+
+    limpio = s.replace(' ', '').lower()
+    limpio = limpio[:len(limpio) - len(limpio) % n]
+    if not (limpio.isascii() and limpio.isalpha()):
+        limpio = ''.join(b for b in separa_grafias(limpio, n)
+                         if all(c in alfabeto for c in b))
+    return limpio.encode('ascii').translate(tabla_valores)
+
+def productos_columnas(valores, n):
+    '''Separa los valores de un texto en las N columnas de sus bloques y
+    precalcula, para cada columna, sus productos por cada uno de los 26
+    coeficientes posibles, empacados como enteros (un byte por letra).
+
+    :param valores: los valores del texto, como los devuelve valores_hill.
+    :param n: el tamaño de los bloques.
+    :returns: una lista de N listas de 26 enteros; productos[i][k] empaca los
+              valores k * x (mod 26) de la columna i.'''
+
+    return [[int.from_bytes(valores[i::n].translate(tablas_producto[k]), 'big')
+             for k in range(26)]
+            for i in range(n)]
+
+def aplica_renglon(productos, renglon, longitud):
+    '''Aplica un renglón de una matriz a todos los bloques del texto a la vez.
+    Cada byte de los enteros empacados es menor a 26, de modo que pueden
+    sumarse hasta 9 columnas sin acarreo entre bytes antes de reducir módulo
+    26.
+
+    :param productos: los productos de las columnas, de productos_columnas
+           (o cualquier colección indexable por columna y coeficiente).
+    :param renglon: los N coeficientes del renglón.
+    :param longitud: la cantidad de bloques del texto.
+    :returns: un objeto bytes con el valor (0 a 25) que produce el renglón en
+              cada bloque.'''
+
+    resultado = 0
+    for i, coef in enumerate(renglon):
+        resultado += productos[i][coef]
+        if i % 9 == 8:
+            resultado = int.from_bytes(resultado.to_bytes(longitud, 'big').translate(tabla_mod26), 'big')
+    return resultado.to_bytes(longitud, 'big').translate(tabla_mod26)
+
+def descifrado_hill_por_renglones(s, n=2, candidatos=8, k=5):
+    '''Busca la matriz de cifrado de Hill de NxN dividiendo la búsqueda por
+    renglones. Cada renglón de la matriz de descifrado determina una sola
+    letra de cada bloque descifrado, así que los 26^N renglones posibles se
+    califican por separado (chi cuadrada de las letras que producen contra el
+    español) y sólo se combinan los mejores CANDIDATOS. Las combinaciones
+    invertibles se ordenan según los bigramas del texto descifrado, lo que
+    además decide el orden de los renglones. Para 2x2 se prueban 676
+    renglones en lugar de 26^4 matrices.
+
+    :param s: el texto cifrado con el sistema de Hill.
+    :param n: el tamaño de la matriz de cifrado.
+    :param candidatos: la cantidad de renglones a conservar para combinar.
+    :param k: la cantidad de matrices a devolver.
+    :returns: una lista con las K mejores tuplas (puntaje, matriz), donde
+              matriz es la tupla de renglones de la matriz de cifrado y el
+              puntaje es el de puntaje_ngramas (mayor es mejor).'''
+
+    valores = valores_hill(s, n)
+    longitud = len(valores) // n
+    productos = productos_columnas(valores, n)
+
+    puntajes = []
+    for renglon in itertools.product(range(26), repeat=n):
+        if any(renglon):
+            salida = aplica_renglon(productos, renglon, longitud)
+            puntajes.append((Histograma.desde_valores(salida).chi_cuadrada(), renglon))
+    mejores = [renglon for _, renglon in heapq.nsmallest(candidatos, puntajes)]
+
+    salidas = {renglon: aplica_renglon(productos, renglon, longitud) for renglon in mejores}
+    intentos = []
+    for combinacion in itertools.permutations(mejores, n):
+        if inversos_26[determinante(combinacion) % 26] is None:
+            continue    # La combinación no es invertible módulo 26.
+        cifrado = matriz_inversa_mod26(combinacion)
+        descifrado = bytearray(len(valores))
+        for i, renglon in enumerate(combinacion):
+            descifrado[i::n] = salidas[renglon]
+        intentos.append((puntaje_ngramas(descifrado, 2), cifrado))
+    return heapq.nlargest(k, intentos, key=lambda t: t[0])
+
 s = 'RX WW YD AD ME ZC SF BI FH QD ZC OQ DB HK AE SW ZY TJ JO ER SW ZY TJ JO CX SA RG AN VZ AV RL AI JP JL XQ XE LU BF MR PV ZC TX MR W— RA EO NU MO KB KX RX SW AJ KI YV DD XI AD JM —L UP CY NR AE NM LD UH HB BI I— CU FB VO WH MR W— ER AL JZ MU MU H— OQ KC OR AV Q— MR W— SA OW OI H— LJ ME GO UZ DE JI DR MR BF HS AE I— SA SA O— AJ AV AL AL RA JP JL QL G— TX H— MR PV ZC MU AI CU SA QL BF AD NM AE I— MU IL MR W— SA HG RA BF HS NM ZC ZL QM —C TU H— OW UB BF DR SA OQ UH NM ZC SF OE H— RA OR FH MU BF ND XZ GT II FB LU JP SW BI WH SA AN OW WW GO QL VX AL —H DR MU ZL BF OQ OP VX H— DV NE MH G— OM AJ RX JL XQ II FB LU JP IC NR S— CD MH RG AN VZ VX UC YB OQ AV RL CJ DF NZ OR ZF JI KX NM MQ VX WW ZC OR MX CY GO NZ AD AV Q— MR W— SA AE SW —H AJ HF GN KG MU QL SA WM SA MN MV ZC XY DR NU G— OM AJ RX JL RI XI AD JM —L UP CY NR XZ DV IL PV AZ HJ KX ME QL JF ZC MU WT ND BF TU DD JZ UU BF AN MQ DW JG PG HG BF GT KG SF KW CX S— TD SA VO Q— QM W— UA MQ NU AV UC OL ZL HV SA RX WW YD AD ME ZC H— BF QL IJ BI RB NU VD SX KX AI AI CU SA BI AJ JF H— QL NU II EO XQ TD DR JI EO OQ ZD ND BI MN JF AI MR MU IS FB RA WW BW IL H— XY DR NU HS SW ZM ND TU HS AJ AV NZ OR AM MR KX NU HG CP MV CY HH BF BM PJ RA TU OM AJ VX I— VO BI IC UH SS OR HS WP JP SW OE EE TC MU P— EW VX I— RA O— CD FB LJ RA CU BF CY NR DR SA MV AJ —P OQ EE CH MV GT KU KX AE YD HB AR VZ IJ TE CY HB JL —T YD HB NM ZC RA G— GY OQ CX NO EE ME OP AI QL SA RG AN I— PV SW QL G— OM AJ RX GO DA XQ II FB LU JP SW JL P— H— OQ YV NU KC AZ PV ZC AI QL RA EW VX BI ZC LU JP LT EE FB DR XQ OP QL AV VZ QL UC FV DK VX NU DR IA —L I— AJ CY NR NU RG AN JL P— SF VG GN ME TD KX AE KW OQ WW NR H— SW HK GT QM KX O— AJ O— GT DA RI XI OJ DE LU RO AZ SA —T ZC OR MX FK EO MV KU JP BI MN AD JM —L UP CY NR TE WW MV NU AV JL CU SA ER SW KS RA WR RA SF I— SA MV KU JP PQ OQ LC HB AR AJ SW SW VK WO QP RA AI XQ DX YV EE DE LU JP AZ AI CU SA KC OR MQ UC XL QL SA G— OM AJ RX JL XQ II FB LU JP SW I— VO Z— ZD ND FH MR MR SA YV NU KC AZ BF CY —M EE FB DR QL SA RG AN PQ DZ VD GO MN —C I— DR QL SA RG AN FW ND CH BF SF SS OR AM MR OJ JG NU HG CP MV CY NR H— NU BZ H— ME HO OR HS ZO RG AE ZC AJ AV Q— MR W— SA NU MN AV ZO MV CG BA TU AE ZC AJ AV XT WT ND QM IA BF AN NZ OR FQ SA NU LX OR NZ OR AM MR KX NU HG CP MV CY NR MN VX G— H— BF ME CY NR AV ZO MV CG BA TU NU AV RG AN BI HF FB MR W— —M VX GN BF HS NM ZC SF JZ CJ OW WW HF ME MN CY NR H— MR AI XY ZD ND BI GJ VX JM BW ND XZ GT II FB LU JP SW UC BI GG IJ TE MV QC KX —C GQ KX BI GJ VX JM XI WW RZ KF SA MV YD SA BF AV XT DZ EE DE SA AV ZO AE VZ BI DV XQ BW ND XZ XT QL LU JP SW BI ZC VX AV WW HS BU NU RG AN BI ZX I— BF HS Z— IG ND OW I— VO ZC NR HK BI AJ VD JA OQ RA OP UH NU GO KI HV QL H— BI OW DE EO TF AD RX GO DW WW ZF JI BF HS BF VD JA OQ RA OP UH NU DE H— —L S— HB VZ KX EE CJ H— HV MR BF HS H— GY DW CD EO HS OP SF I— SA MV KU JP BI QC OJ GR EO CK LU JP QC OM FB DR QL SA RG AN PQ YV DE MU ZR MV HF YV HS SW ZM ND MI YB OQ VO I— QM W— TD SA G— OM AJ RX JL XQ II FB LU JP WL ND MQ H— ME AZ MH IL ME NM ZC OQ QL LU JP XI GO Q— NR ZD ND FH SA O— AJ AV AM RA H— HS CH DW NU YV NU KC AZ BF CY TU NO EE ME NU AV JL CU SA OP IL AD VX NZ NR NU LU RO LP IR OQ G— OM AJ RX NU HG CP MV CY NR NU BZ NU H— ME DA H— —C IC LJ DR DR QL RA EW VX BI ZC LU JP QC OM FB GJ AV GL OE QL SA RG AN FH NO '
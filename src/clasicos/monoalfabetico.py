@@ -2,6 +2,15 @@
 Funciones para cifrar y descifrar con transformaciones afines (monoalfabéticos)
 '''
 
+import math
+import operator
+import unicodedata
+from array import array
+from collections import Counter
+from functools import lru_cache
+
+from aritmetica_modular import inversos_26, mcd
+
 # ------------------------------------------------------------------------------
 # --                             FUNCIONES                                    --
 # ------------------------------------------------------------------------------
@@ -17,13 +26,8 @@ def cifrado_monoalfabetico(texto, coef_A, coef_B):
            cifrar.
     :returns: un texto cifrado usando la función afín especificada.'''
 
-    criptograma = ''
-    for c in texto:
-        indice_c = alfabeto[c]
-        nuevo_indice = evalua_afin(indice_c, coef_A, coef_B)
-        nueva_letra = alfabeto_inverso[nuevo_indice]
-        criptograma += nueva_letra
-    return criptograma
+    return afin_compilado(congruente_mod26(coef_A),
+                          congruente_mod26(coef_B)).cifra(texto)
 
 def descifrado_monoalfabetico(texto, coef_a, coef_b):
     '''Descifra el texto usando la función afín especificada. Los parámetros de
@@ -36,10 +40,8 @@ def descifrado_monoalfabetico(texto, coef_a, coef_b):
     :coef_b: el parámetro B (desplazamiento) de la función afín usada para
              cifrar.'''
 
-    cript_limpio = texto.lower().replace(' ', '')
-    inv_a, inv_b = inversa_afin(coef_a, coef_b)
-
-    return cifrado_monoalfabetico(cript_limpio, inv_a, inv_b).lower()
+    return afin_compilado(congruente_mod26(coef_a),
+                          congruente_mod26(coef_b)).descifra(texto)
 
 def descifrado_fuerza_bruta(texto, longitud):
     '''Muestra todas las combinaciones de funciones afines para intentar
@@ -64,6 +66,184 @@ def descifrado_fuerza_bruta(texto, longitud):
             print('El texto descifrado es: ', intento)
             print('')
 
+def descifrado_afin_por_puntaje(texto, k=10, criterio='chi'):
+    '''Prueba las 312 funciones afines sobre el texto especificado sin
+    descifrarlo con cada una. El histograma de letras se cuenta una sola vez:
+    descifrar con una función afín sólo permuta sus 26 conteos, así que todas
+    las funciones se califican a la vez a partir del histograma (ver
+    puntajes_afines). Las mejores se vuelven a calificar de forma exacta y
+    sólo se descifra el texto con la mejor de todas.
+
+    :param texto: el texto cifrado con una función afín.
+    :param k: la cantidad de funciones a devolver.
+    :param criterio: 'chi' para ordenar por chi cuadrada contra el español (de
+           menor a mayor) o 'log' para ordenar por log-verosimilitud (de mayor
+           a menor).
+    :returns: una tupla (claves, descifrado), donde claves es una lista con las
+              K mejores tuplas (puntaje, (coef_A, coef_B)) de la función afín
+              de cifrado, y descifrado es el texto descifrado con la mejor.'''
+
+    conteos = Histograma.desde_texto(texto).conteos
+    if sum(conteos) == 0:
+        return [], ''
+    aproximados = puntajes_afines(conteos, criterio)
+    # Los puntajes aproximados usan pesos redondeados (con error relativo
+    # menor a 10^-3); se recalifican todas las funciones que, por el redondeo,
+    # podrían estar entre las K mejores.
+    umbral = sorted(aproximados)[min(k, len(aproximados)) - 1] * 1.001
+    claves = sorted(((puntaje_afin(conteos, *claves_afines[i], criterio), claves_afines[i])
+                     for i, puntaje in enumerate(aproximados) if puntaje <= umbral),
+                    key=lambda t: t[0], reverse=criterio == 'log')[:k]
+    return claves, afin_compilado(*claves[0][1]).descifra(texto)
+
+def puntaje_afin(conteos, coef_A, coef_B, criterio='chi'):
+    '''Califica una función afín a partir de los conteos de letras del texto
+    cifrado. Si el texto se cifró con f(x) = Ax + B, la letra clara x aparece
+    tantas veces como la letra cifrada f(x).
+
+    :param conteos: los 26 conteos de las letras del texto cifrado.
+    :param coef_A: el coeficiente A de la función afín de cifrado.
+    :param coef_B: el coeficiente B de la función afín de cifrado.
+    :param criterio: 'chi' para la chi cuadrada contra el español o 'log' para
+           la log-verosimilitud (en base 10).
+    :returns: el puntaje del texto descifrado con la función.'''
+
+    claros = [conteos[(coef_A * x + coef_B) % 26] for x in range(26)]
+    if criterio == 'chi':
+        return chi_cuadrada(claros)
+    return sum(f * math.log10(p) for f, p in zip(claros, probabilidades_espannol))
+
+def puntajes_afines(conteos, criterio='chi'):
+    '''Califica de forma aproximada las 312 funciones afines a partir de los
+    conteos de letras del texto cifrado, todas a la vez. Los pesos enteros de
+    cada letra cifrada para las 312 funciones se empacan en un solo entero,
+    con un campo de bits por función (ver columnas_empacadas), de modo que
+    los 312 puntajes se obtienen con 26 multiplicaciones por un conteo y una
+    suma, igual que en producto_bloques.
+
+    :param conteos: los 26 conteos de las letras del texto cifrado.
+    :param criterio: 'chi' o 'log'.
+    :returns: una lista con un puntaje entero para cada función de
+              claves_afines, en el mismo orden. En ambos criterios un puntaje
+              menor es mejor.'''
+
+    if criterio == 'chi':
+        valores = [f * f for f in conteos]
+    elif criterio == 'log':
+        valores = list(conteos)
+    else:
+        raise ValueError('El criterio debe ser \'chi\' o \'log\'.')
+
+    # Cada campo debe poder guardar el puntaje más grande posible, para que
+    # no haya acarreo entre campos.
+    cota = sum(valores) * max(pesos_enteros(criterio))
+    ancho = 8 * (cota.bit_length() // 64 + 1)
+    total = sum(map(operator.mul, valores, columnas_empacadas(criterio, ancho)))
+    campos = total.to_bytes(len(claves_afines) * ancho, 'little')
+    if ancho == 8:
+        return memoryview(campos).cast('Q').tolist()
+    return [int.from_bytes(campos[i:i + ancho], 'little') for i in range(0, len(campos), ancho)]
+
+@lru_cache(maxsize=None)
+def pesos_enteros(criterio):
+    '''Obtiene el peso entero de cada letra clara en los puntajes
+    aproximados: 2^10 / p[x] para la chi cuadrada y -2^10 * log10(p[x]) para
+    la log-verosimilitud.
+
+    :param criterio: 'chi' o 'log'.
+    :returns: una tupla con los 26 pesos.'''
+
+    if criterio == 'chi':
+        return tuple(round(2 ** 10 / p) for p in probabilidades_espannol)
+    return tuple(round(-2 ** 10 * math.log10(p)) for p in probabilidades_espannol)
+
+@lru_cache(maxsize=None)
+def columnas_empacadas(criterio, ancho):
+    '''Empaca, para cada letra cifrada y, el peso que tiene en el puntaje de
+    cada una de las 312 funciones afines: si f(x) = y, el de la letra clara x.
+
+    :param criterio: 'chi' o 'log'.
+    :param ancho: la cantidad de bytes de cada campo.
+    :returns: una lista de 26 enteros, uno por letra cifrada, con un campo
+              por función de claves_afines.'''
+
+    pesos = pesos_enteros(criterio)
+    columnas = []
+    for y in range(26):
+        campos = b''.join(pesos[inverso(coef_A) * (y - coef_B) % 26].to_bytes(ancho, 'little')
+                          for coef_A, coef_B in claves_afines)
+        columnas.append(int.from_bytes(campos, 'little'))
+    return columnas
+
+class CifradoAfin:
+    '''Cifrado afín compilado. Precalcula una sola vez las tablas de
+    sustitución de la función afín f(x) = Ax + B (y de su inversa), de modo que
+    cifrar o descifrar un texto completo se reduce a una llamada a
+    str.translate o bytes.translate, sin llamadas a Python por cada caracter.
+    Los caracteres fuera del alfabeto de 26 letras se dejan sin cambio.'''
+
+    def __init__(self, coef_A, coef_B):
+        '''Construye las tablas de sustitución para la función afín indicada.
+
+        :param coef_A: el coeficiente A (salto) de la función afín para cifrar.
+        :param coef_B: el coeficiente B (desplazamiento) de la función afín
+               para cifrar.'''
+
+        self.coef_A = coef_A
+        self.coef_B = coef_B
+
+        claras = ''.join(alfabeto.keys())
+        cifradas = ''.join(alfabeto_inverso[evalua_afin(alfabeto[c], coef_A, coef_B)]
+                           for c in claras)
+        self.tabla_cifrado = str.maketrans(claras, cifradas)
+        self.tabla_cifrado_bytes = bytes.maketrans(claras.encode(), cifradas.encode())
+
+        # Sin inverso para coef_A no hay tablas de descifrado; descifra() lanza
+        # la misma excepción que inversa_afin.
+        self.tabla_descifrado = None
+        self.tabla_descifrado_bytes = None
+        if maximo_comun_divisor(coef_A, 26) == 1:
+            # Al descifrar se aceptan mayúsculas y minúsculas, y se eliminan
+            # los espacios, igual que en descifrado_monoalfabetico.
+            origen = cifradas.lower() + cifradas
+            destino = claras + claras
+            self.tabla_descifrado = str.maketrans(origen, destino, ' ')
+            self.tabla_descifrado_bytes = bytes.maketrans(origen.encode(), destino.encode())
+
+    def cifra(self, texto):
+        '''Cifra el texto especificado (en minúsculas, sin espacios).
+
+        :param texto: el texto a cifrar.
+        :returns: el texto cifrado, en mayúsculas.'''
+
+        if texto.isascii():
+            return texto.encode('ascii').translate(self.tabla_cifrado_bytes).decode('ascii')
+        return texto.translate(self.tabla_cifrado)
+
+    def descifra(self, texto):
+        '''Descifra el texto especificado, cifrado con esta función afín.
+
+        :param texto: el criptograma a descifrar.
+        :returns: el texto descifrado, en minúsculas.'''
+
+        if self.tabla_descifrado is None:
+            inversa_afin(self.coef_A, self.coef_B)    # Lanza la excepción.
+        if texto.isascii():
+            return texto.encode('ascii').translate(self.tabla_descifrado_bytes, b' ').decode('ascii')
+        return texto.lower().translate(self.tabla_descifrado)
+
+@lru_cache(maxsize=1024)
+def afin_compilado(coef_A, coef_B):
+    '''Devuelve el cifrado afín compilado para los coeficientes indicados. Las
+    tablas se construyen una sola vez por clave y se reutilizan en llamadas
+    posteriores.
+
+    :param coef_A: el coeficiente A (salto) de la función afín.
+    :param coef_B: el coeficiente B (desplazamiento) de la función afín.
+    :returns: un objeto CifradoAfin para la clave (A, B).'''
+
+    return CifradoAfin(coef_A, coef_B)
+
 # ------------------------------------------------------------------------------
 # --                               AUXILIARES                                 --
 # ------------------------------------------------------------------------------
@@ -75,47 +255,29 @@ def congruente_mod26(a):
     :param a: un entero al que se obtendrá su congruencia, módulo 26.
     :returns: el entero x que satisface la congruencia a = x (mod 26). '''
 
-    if 0 <= a and a < 26:
-        return a
-    elif a >= 26:
-        return a - (26 * (a // 26))
-    else:
-        val = a
-        while val < 0:
-            val += 26
-        return val
+    return a % 26
 
 def maximo_comun_divisor(a, b):
     '''Devuelve el máximo común divisor de los valores especificados usando el
-    algoritmo de Euclides de manera recursiva.
+    algoritmo de Euclides (ver aritmetica_modular.mcd).
 
     :param a: el primer valor para calcular el MCD.
-    :param a: el segundo valor para calcular el MCD.
+    :param b: el segundo valor para calcular el MCD.
     :returns: el MCD entre a y b.'''
 
-    if a == 0:
-        return b
-    elif b == 0:
-        return a
-    elif b > a:
-        return maximo_comun_divisor(b, a)
-    else:
-        return maximo_comun_divisor(b, a - (b * (a // b)))
+    return mcd(a, b)
 
 def inverso(a):
-    '''Obtiene el inverso multiplicativo del valor especificado, módulo 26.
+    '''Obtiene el inverso multiplicativo del valor especificado, módulo 26,
+    de la tabla de inversos que se construye al importar el módulo.
 
     :param a: el valor para el que se busca el inverso multiplicativo.
     :returns: el inverso multiplicativo de a, módulo 26.'''
 
-    if maximo_comun_divisor(a, 26) == 1:
-        for i in range(0, 26):
-            val = congruente_mod26(a * i)
-            if val == 1:
-                return i
-        raise Exception('No se pudo encontrar el inverso. Si estás viendo esto, algo muy raro pasó. D:')
-    else:
-         raise Exception('El valor no tiene inverso módulo 26.')
+    inv = inversos_26[a % 26]
+    if inv is None:
+        raise Exception('El valor no tiene inverso módulo 26.')
+    return inv
 
 def evalua_afin(x, a, b):
     '''Evalúa la función afín especificada a través de sus parámetros, en el
@@ -143,32 +305,58 @@ def inversa_afin(coef_A, coef_B):
     else:
         raise Exception('No se puede calcular función inversa: coef_A no tiene inverso.')
             
-def limpiar_texto(texto):
+def limpiar_texto(texto, enne='nn'):
     '''Eliminar espacios y caracteres especiales del texto dado. Además,
-    convierte el texto a sólo minúsculas.
+    convierte el texto a sólo minúsculas y quita los acentos y diéresis, de
+    modo que el resultado sólo contiene letras del alfabeto de 26 letras.
+
+    Cada paso recorre el texto una sola vez: los acentos se separan de las
+    letras con la normalización NFD, y el paso a minúsculas y la eliminación de
+    todo lo que no sea letra se hacen con una sola tabla de traducción.
 
     :param texto: el texto sobre el cual se va a hacer la limpieza.
+    :param enne: la cadena por la que se sustituye la ñ ('nn' por omisión;
+           'n' para quitarle la tilde, o '' para eliminarla).
     :returns: un texto en minúsculas sin espacios ni caracteres especiales.'''
 
-    nuevo_texto = texto.lower()
-
-    # Cualquier implementación que se me ocurrió tiene complejidad O(n*m), con
-    # n la longitud del texto y m la cantidad de caracteres a remover.
-
-    nuevo_texto = nuevo_texto.replace('\n', ' ')
-
-    por_quitar = ' :.,«»()-'
-    for simbolo in por_quitar:
-        nuevo_texto = nuevo_texto.replace(simbolo, '')
-        
-    nuevo_texto = nuevo_texto.replace('á', 'a')
-    nuevo_texto = nuevo_texto.replace('é', 'e')
-    nuevo_texto = nuevo_texto.replace('í', 'i')
-    nuevo_texto = nuevo_texto.replace('ó', 'o')
-    nuevo_texto = nuevo_texto.replace('ú', 'u')
-    nuevo_texto = nuevo_texto.replace('ñ', 'nn')
-
-    return nuevo_texto
+    # En la forma NFD la ñ queda como una n seguida de una tilde combinable.
+    nuevo_texto = unicodedata.normalize('NFD', texto)
+    nuevo_texto = nuevo_texto.replace('n\u0303', enne).replace('N\u0303', enne)
+    nuevo_texto = nuevo_texto.encode('ascii', 'ignore')
+    return nuevo_texto.translate(tabla_minusculas, no_letras).decode('ascii')
+
+def limpiar_archivo(ruta, enne='nn', tamanno=1 << 20, codificacion='utf-8'):
+    '''Lee el archivo especificado por partes y devuelve cada parte limpia
+    (ver limpiar_texto), sin cargar el archivo completo en memoria.
+
+    :param ruta: la ruta del archivo a limpiar.
+    :param enne: la cadena por la que se sustituye la ñ.
+    :param tamanno: la cantidad de caracteres a leer en cada parte.
+    :param codificacion: la codificación del archivo.
+    :returns: un generador de cadenas limpias; su concatenación es igual a
+              limpiar_texto aplicado al archivo completo.'''
+
+    with open(ruta, 'r', encoding=codificacion) as archivo:
+        yield from limpiar_partes(iter(lambda: archivo.read(tamanno), ''), enne)
+
+def limpiar_partes(partes, enne='nn'):
+    '''Limpia un texto que llega por partes (ver limpiar_texto). Una letra y
+    los acentos que la siguen pueden quedar en partes distintas, así que el
+    último caracter base de cada parte se procesa junto con la siguiente.
+
+    :param partes: un iterable de cadenas.
+    :param enne: la cadena por la que se sustituye la ñ.
+    :returns: un generador de cadenas limpias.'''
+
+    pendiente = ''
+    for parte in partes:
+        parte = pendiente + parte
+        corte = len(parte) - 1
+        while corte > 0 and unicodedata.combining(parte[corte]):
+            corte -= 1
+        pendiente = parte[corte:]
+        yield limpiar_texto(parte[:corte], enne)
+    yield limpiar_texto(pendiente, enne)
 
 # ------------------------------------------------------------------------------
 # --                    AUXILIARES PARA CRIPTOANALISIS                        --
@@ -183,13 +371,154 @@ def frecuencias(texto):
     :returns: un diccionario que asocia cada letra del abecedario con la
               cantidad de apariciones en el texto.'''
 
-    tabla_frec = {}
-    for c in texto:
-        if c not in tabla_frec:
-            tabla_frec[c] = 1
+    return dict(Counter(texto))
+
+class Histograma:
+    '''Conteo de las apariciones de cada letra de un texto, guardado en un
+    arreglo fijo de 26 enteros (indexado como en alfabeto). Permite combinar
+    conteos, actualizarlos al deslizar una ventana sobre el texto y calcular
+    el índice de coincidencias y la chi cuadrada sin volver a recorrer el
+    texto.'''
+
+    def __init__(self, conteos=None):
+        '''Inicializa el histograma con los conteos especificados.
+
+        :param conteos: una secuencia de 26 conteos. Si no se especifica, el
+               histograma inicia vacío.'''
+
+        self.conteos = array('l', conteos if conteos is not None else [0] * 26)
+
+    @staticmethod
+    def desde_texto(texto):
+        '''Cuenta las letras del texto especificado, sin distinguir entre
+        mayúsculas y minúsculas. Se ignora cualquier otro caracter.
+
+        :param texto: una cadena (o bytes) con el texto.
+        :returns: el histograma de las letras del texto.'''
+
+        histograma = Histograma()
+        histograma.agrega(texto)
+        return histograma
+
+    @staticmethod
+    def desde_valores(valores):
+        '''Cuenta los valores numéricos (0 a 25) de un texto representado como
+        bytes, como los que produce tabla_valores.
+
+        :param valores: un objeto bytes con los valores de las letras.
+        :returns: el histograma de los valores.'''
+
+        return Histograma([valores.count(x) for x in range(26)])
+
+    def agrega(self, texto):
+        '''Suma al histograma las letras del texto especificado.
+
+        :param texto: una cadena (o bytes) con el texto.'''
+
+        if isinstance(texto, str):
+            letras, mayusculas = alfabeto.keys(), alfabeto_inverso.values()
         else:
-            tabla_frec[c] += 1
-    return tabla_frec
+            letras, mayusculas = letras_bytes, mayusculas_bytes
+        # Si el texto está todo en minúsculas (o en mayúsculas) basta con
+        # contar uno de los dos casos.
+        if texto.islower():
+            mayusculas = ()
+        elif texto.isupper():
+            letras = ()
+        for i, c in enumerate(letras):
+            self.conteos[i] += texto.count(c)
+        for i, c in enumerate(mayusculas):
+            self.conteos[i] += texto.count(c)
+
+    def quita(self, texto):
+        '''Resta del histograma las letras del texto especificado.
+
+        :param texto: una cadena (o bytes) con el texto.'''
+
+        quitadas = Histograma.desde_texto(texto)
+        for i in range(26):
+            self.conteos[i] -= quitadas.conteos[i]
+
+    def desliza(self, sale, entra):
+        '''Actualiza el histograma al deslizar una ventana sobre el texto: la
+        letra SALE deja la ventana y la letra ENTRA se agrega.
+
+        :param sale: la letra que sale de la ventana.
+        :param entra: la letra que entra a la ventana.'''
+
+        self.conteos[alfabeto[sale.lower()]] -= 1
+        self.conteos[alfabeto[entra.lower()]] += 1
+
+    def fusiona(self, otro):
+        '''Suma al histograma los conteos de otro histograma.
+
+        :param otro: el histograma a sumar.'''
+
+        for i in range(26):
+            self.conteos[i] += otro.conteos[i]
+
+    def __add__(self, otro):
+        '''Devuelve un nuevo histograma con la suma de ambos conteos.'''
+
+        return Histograma([a + b for a, b in zip(self.conteos, otro.conteos)])
+
+    def total(self):
+        '''Devuelve la cantidad total de letras contadas.'''
+
+        return sum(self.conteos)
+
+    def indice_coincidencias(self):
+        '''Calcula el índice de coincidencias a partir de los conteos.'''
+
+        return indice_coincidencias_conteos(self.conteos)
+
+    def chi_cuadrada(self, probabilidades=None):
+        '''Calcula la chi cuadrada de los conteos contra la distribución
+        especificada (por omisión, la del español).'''
+
+        return chi_cuadrada(self.conteos, probabilidades)
+
+    def como_diccionario(self):
+        '''Devuelve los conteos como un diccionario que asocia cada letra que
+        aparece con su cantidad de apariciones, como frecuencias.'''
+
+        return {c: f for c, f in zip(alfabeto.keys(), self.conteos) if f > 0}
+
+def indice_coincidencias_conteos(conteos):
+    '''Obtiene el índice de coincidencias a partir de los conteos de cada
+    letra, sin necesidad de recorrer el texto.
+
+    :param conteos: una lista con la cantidad de apariciones de cada letra,
+           indexada como en alfabeto.
+    :returns: el índice de coincidencias del texto con esos conteos.'''
+
+    longitud = sum(conteos)
+    if longitud < 2:
+        return 0
+    return sum(f * (f - 1) for f in conteos) / (longitud * (longitud - 1))
+
+def chi_cuadrada(conteos, probabilidades=None):
+    '''Calcula el estadístico chi cuadrada de los conteos de letras
+    especificados contra una distribución esperada (por omisión, la del
+    español). Mientras menor sea el valor, más se parece el texto a la
+    distribución esperada.
+
+    :param conteos: una lista con la cantidad de apariciones de cada letra,
+           indexada como en alfabeto.
+    :param probabilidades: la probabilidad esperada de cada letra. Por
+           omisión, probabilidades_espannol.
+    :returns: el valor del estadístico chi cuadrada.'''
+
+    if probabilidades is None:
+        probabilidades = probabilidades_espannol
+    longitud = sum(conteos)
+    if longitud == 0:
+        return 0
+    chi = 0
+    for f, prob in zip(conteos, probabilidades):
+        esperado = longitud * prob
+        chi += (f - esperado) ** 2 / esperado
+    return chi
 
 # ------------------------------------------------------------------------------
 # --                            CONSTANTES                                    --
@@ -256,3 +585,55 @@ alfabeto_inverso = {
 
 # Coeficientes de salto válidos para funciones afines.
 coprimos_26 = [i for i in range(0, 26) if maximo_comun_divisor(i, 26) == 1]
+
+# Las 312 funciones afines (coef_A, coef_B) con inverso, en el orden de
+# puntajes_afines.
+claves_afines = [(a, b) for a in coprimos_26 for b in range(0, 26)]
+
+# Frecuencias relativas (en porcentaje) de las letras en el español. La ñ se
+# suma a la n dos veces, ya que limpiar_texto la sustituye por 'nn'.
+frecuencias_espannol = {
+    'a': 11.525,
+    'b': 2.215,
+    'c': 4.019,
+    'd': 5.010,
+    'e': 12.181,
+    'f': 0.692,
+    'g': 1.768,
+    'h': 0.703,
+    'i': 6.247,
+    'j': 0.493,
+    'k': 0.011,
+    'l': 4.967,
+    'm': 3.157,
+    'n': 6.712 + 2 * 0.311,
+    'o': 8.683,
+    'p': 2.510,
+    'q': 0.877,
+    'r': 6.871,
+    's': 7.977,
+    't': 4.632,
+    'u': 2.927,
+    'v': 1.138,
+    'w': 0.017,
+    'x': 0.215,
+    'y': 1.008,
+    'z': 0.467
+}
+
+# Probabilidad de cada letra en el español, indexada como en alfabeto.
+probabilidades_espannol = [frecuencias_espannol[c] / sum(frecuencias_espannol.values())
+                           for c in alfabeto]
+
+# Tablas para operar sobre textos representados como bytes con los valores
+# numéricos de sus letras (0 a 25), de modo que las operaciones se hacen con
+# bytes.translate en lugar de recorrer el texto caracter por caracter.
+tabla_valores = bytes.maketrans(''.join(alfabeto.keys()).encode(), bytes(range(26)))
+tabla_letras = bytes.maketrans(bytes(range(26)), ''.join(alfabeto_inverso.values()).encode())
+tabla_mod26 = bytes(i % 26 for i in range(256))
+letras_bytes = [bytes([b]) for b in ''.join(alfabeto.keys()).encode()]
+mayusculas_bytes = [bytes([b]) for b in ''.join(alfabeto_inverso.values()).encode()]
+tabla_minusculas = bytes.maketrans(''.join(alfabeto_inverso.values()).encode(),
+                                   ''.join(alfabeto.keys()).encode())
+no_letras = bytes(i for i in range(256) if chr(i).lower() not in alfabeto)
+tablas_producto = [bytes((k * i) % 26 for i in range(256)) for k in range(26)]
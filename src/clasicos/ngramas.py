@@ -0,0 +1,72 @@
+'''
+Estadísticas de n-gramas del español, usadas para medir qué tan parecido al
+español es un texto descifrado.
+'''
+
+import math
+import os
+from functools import lru_cache
+
+from monoalfabetico import *
+
+# Texto en español usado para estimar las probabilidades de los n-gramas.
+corpus_espannol = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               '..', '..', 'data', 'Texto1.txt')
+
+def cuenta_ngramas(valores, n):
+    '''Cuenta las apariciones de cada n-grama en el texto especificado.
+
+    :param valores: el texto, como una secuencia de valores numéricos (0 a 25).
+    :param n: la longitud de los n-gramas.
+    :returns: una lista de 26^n conteos, donde el n-grama (x1, ..., xn) está en
+              el índice x1 * 26^(n - 1) + ... + xn.'''
+
+    conteos = [0] * (26 ** n)
+    for indice in indices_ngramas(valores, n):
+        conteos[indice] += 1
+    return conteos
+
+def indices_ngramas(valores, n):
+    '''Obtiene el índice de cada n-grama del texto especificado, en el orden en
+    el que aparecen.
+
+    :param valores: el texto, como una secuencia de valores numéricos (0 a 25).
+    :param n: la longitud de los n-gramas.
+    :returns: un iterador sobre los índices de los n-gramas del texto.'''
+
+    indice = 0
+    modulo = 26 ** (n - 1)
+    for i, x in enumerate(valores):
+        indice = (indice % modulo) * 26 + x
+        if i >= n - 1:
+            yield indice
+
+@lru_cache(maxsize=None)
+def tabla_log_probabilidades(n, corpus=corpus_espannol):
+    '''Estima el logaritmo de la probabilidad de cada n-grama a partir del
+    corpus especificado. A los n-gramas que no aparecen en el corpus se les
+    asigna una probabilidad pequeña, en lugar de cero. La tabla se calcula una
+    sola vez por corpus y longitud.
+
+    :param n: la longitud de los n-gramas.
+    :param corpus: la ruta del archivo con el texto en español.
+    :returns: una lista de 26^n logaritmos, indexada como en cuenta_ngramas.'''
+
+    texto = ''.join(limpiar_archivo(corpus))
+    valores = texto.encode('ascii').translate(tabla_valores)
+    conteos = cuenta_ngramas(valores, n)
+    total = sum(conteos)
+    minimo = math.log10(0.01 / total)
+    return [math.log10(c / total) if c > 0 else minimo for c in conteos]
+
+def puntaje_ngramas(valores, n):
+    '''Calcula qué tan parecido al español es un texto, como la suma de los
+    logaritmos de las probabilidades de sus n-gramas. Mientras mayor sea el
+    valor, más se parece el texto al español.
+
+    :param valores: el texto, como una secuencia de valores numéricos (0 a 25).
+    :param n: la longitud de los n-gramas.
+    :returns: el puntaje del texto.'''
+
+    tabla = tabla_log_probabilidades(n)
+    return sum(map(tabla.__getitem__, indices_ngramas(valores, n)))
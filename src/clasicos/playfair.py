@@ -1,5 +1,12 @@
+import math
+import operator
+import random
+import time
+from functools import lru_cache
+
 from monoalfabetico import *
 from hill import *
+from ngramas import *
 
 def cifrado_playfair(cuadro, texto):
     '''Cifra el texto usando el cuadro de Playfair especificado.
@@ -8,18 +15,7 @@ def cifrado_playfair(cuadro, texto):
     :param texto: el texto a cifrar.
     :returns: el texto cifrado usando el cuadro de Playfair.'''
 
-    digramas = separa_grafias(texto.lower(), 2)
-    cifrado = ''
-    for d in digramas:
-        x1, y1 = busca_letra(cuadro, d[0])
-        x2, y2 = busca_letra(cuadro, d[1])
-        if x1 == x2:
-            cifrado += cuadro[x1][(y1 + 1) % 5] + cuadro[x1][(y2 + 1) % 5]
-        elif y1 == y2:
-            cifrado += cuadro[(x1 + 1) % 5][y1] + cuadro[(x2 + 1) % 5][y1]
-        else:
-            cifrado += cuadro[x1][y2] + cuadro[x2][y1]
-    return cifrado.upper()
+    return playfair_compilado(cuadro_tupla(cuadro)).cifra(texto)
 
 def descifrado_playfair(cuadro, texto):
     '''Aplica las reglas inversas para descifrar con el cuadro de Playfair
@@ -29,18 +25,7 @@ def descifrado_playfair(cuadro, texto):
     :param texto: el texto cifrado con el CUADRO de Playfair.
     :returns: el texto descifrado usando el cuadro de Playfair'''
 
-    digramas = separa_grafias(texto.lower(), 2)
-    cifrado = ''
-    for d in digramas:
-        x1, y1 = busca_letra(cuadro, d[0])
-        x2, y2 = busca_letra(cuadro, d[1])
-        if x1 == x2:
-            cifrado += cuadro[x1][(y1 - 1) % 5] + cuadro[x1][(y2 - 1) % 5]
-        elif y1 == y2:
-            cifrado += cuadro[(x1 - 1) % 5][y1] + cuadro[(x2 - 1) % 5][y1]
-        else:
-            cifrado += cuadro[x1][y2] + cuadro[x2][y1]
-    return cifrado
+    return playfair_compilado(cuadro_tupla(cuadro)).descifra(texto)
 
 def construye_cuadro(clave):
     '''Obtiene el cuadro de Playfair a partir de la clave especificada.
@@ -88,4 +73,360 @@ def busca_letra(cuadro, letra):
                 return (i, j)
     return (4, 4)    # La letra que falta se coloca en la ultima posicion.
 
+class CuadroPlayfair:
+    '''Cuadro de Playfair compilado. Guarda la posición de cada letra del
+    cuadro y precalcula el resultado de cifrar y descifrar cada uno de los
+    digramas posibles, de modo que procesar un texto se reduce a una búsqueda
+    en una tabla por cada par de letras.'''
+
+    def __init__(self, cuadro):
+        '''Compila el cuadro de Playfair especificado.
+
+        :param cuadro: el cuadro de Playfair, como lo devuelve
+               construye_cuadro.'''
+
+        self.cuadro = [list(renglon) for renglon in cuadro]
+        self.posiciones = {letra: (i, j)
+                           for i, renglon in enumerate(self.cuadro)
+                           for j, letra in enumerate(renglon)}
+        self.tabla_cifrado = {}
+        self.tabla_descifrado = {}
+        letras = alfabeto.keys()
+        for x in letras:
+            for y in letras:
+                self.tabla_cifrado[x + y] = self.digrama(x, y, 1)
+                self.tabla_descifrado[x + y] = self.digrama(x, y, -1)
+
+    def posicion(self, letra):
+        '''Busca la posición de la letra en el cuadro, igual que busca_letra.
+
+        :param letra: la letra que será buscada.
+        :returns: una tupla (x, y) indicando la posición de la letra.'''
+
+        return self.posiciones.get(letra.lower().strip(), (4, 4))
+
+    def digrama(self, a, b, sentido):
+        '''Aplica las reglas de Playfair al digrama formado por las letras
+        especificadas.
+
+        :param a: la primera letra del digrama.
+        :param b: la segunda letra del digrama.
+        :param sentido: 1 para cifrar, -1 para descifrar.
+        :returns: el digrama resultante.'''
+
+        cuadro = self.cuadro
+        x1, y1 = self.posicion(a)
+        x2, y2 = self.posicion(b)
+        if x1 == x2:
+            return cuadro[x1][(y1 + sentido) % 5] + cuadro[x1][(y2 + sentido) % 5]
+        elif y1 == y2:
+            return cuadro[(x1 + sentido) % 5][y1] + cuadro[(x2 + sentido) % 5][y1]
+        else:
+            return cuadro[x1][y2] + cuadro[x2][y1]
+
+    def aplica(self, texto, tabla, sentido):
+        '''Sustituye cada digrama del texto usando la tabla especificada.
+
+        :param texto: el texto a procesar.
+        :param tabla: la tabla de digramas (de cifrado o de descifrado).
+        :param sentido: 1 para cifrar, -1 para descifrar.
+        :returns: el texto resultante.'''
+
+        texto = texto.lower()
+        if len(texto) % 2 != 0:
+            raise ValueError('El texto debe tener una cantidad par de caracteres.')
+        digramas = map(operator.add, texto[0::2], texto[1::2])
+        try:
+            return ''.join(map(tabla.__getitem__, digramas))
+        except KeyError:
+            # Caracteres fuera del alfabeto: se procesan como en busca_letra.
+            return ''.join(tabla.get(d) or self.digrama(d[0], d[1], sentido)
+                           for d in map(operator.add, texto[0::2], texto[1::2]))
+
+    def cifra(self, texto):
+        '''Cifra el texto usando este cuadro.
+
+        :param texto: el texto a cifrar.
+        :returns: el texto cifrado, en mayúsculas.'''
+
+        return self.aplica(texto, self.tabla_cifrado, 1).upper()
+
+    def descifra(self, texto):
+        '''Descifra el texto usando este cuadro.
+
+        :param texto: el texto cifrado.
+        :returns: el texto descifrado, en minúsculas.'''
+
+        return self.aplica(texto, self.tabla_descifrado, -1)
+
+def cuadro_tupla(cuadro):
+    '''Convierte el cuadro de Playfair en una tupla de tuplas, para poder
+    usarlo como llave.
+
+    :param cuadro: el cuadro de Playfair.
+    :returns: el cuadro como tupla de renglones.'''
+
+    return tuple(tuple(renglon) for renglon in cuadro)
+
+@lru_cache(maxsize=256)
+def playfair_compilado(cuadro):
+    '''Devuelve el cuadro de Playfair compilado, reutilizando el de llamadas
+    anteriores con el mismo cuadro.
+
+    :param cuadro: el cuadro de Playfair, como tupla de renglones.
+    :returns: un objeto CuadroPlayfair.'''
+
+    return CuadroPlayfair(cuadro)
+
+class RecocidoPlayfair:
+    '''Búsqueda de la clave de un criptograma de Playfair por recocido
+    simulado sobre cuadros de 5x5. Los candidatos se califican con los
+    logaritmos de las probabilidades de los trigramas del español.
+
+    Todo trigrama del texto descifrado cae dentro de dos digramas
+    consecutivos, así que el puntaje se descompone en una suma sobre los
+    pares de digramas consecutivos distintos del criptograma. Al intercambiar
+    dos letras del cuadro sólo cambia el descifrado de los digramas que
+    contienen a alguna de ellas, o cuyo descifrado la contiene; sólo esos se
+    vuelven a descifrar y sólo se recalculan los pares que los incluyen.'''
+
+    def __init__(self, criptograma):
+        '''Prepara el criptograma para la búsqueda.
+
+        :param criptograma: el texto cifrado con Playfair, sin espacios.'''
+
+        valores = [alfabeto[c] for c in criptograma.lower() if c in alfabeto]
+        digramas = [(valores[i], valores[i + 1]) for i in range(0, len(valores) - 1, 2)]
+        tipos = {}
+        for d in digramas:
+            tipos.setdefault(d, len(tipos))
+        secuencia = [tipos[d] for d in digramas]
+
+        self.letras = sorted(set(valores))
+        if len(self.letras) > 25:
+            raise ValueError('El criptograma usa más de 25 letras distintas.')
+        # Se completa con las letras más frecuentes del español que falten.
+        faltantes = sorted((l for l in range(26) if l not in self.letras),
+                           key=lambda l: probabilidades_espannol[l], reverse=True)
+        self.letras += faltantes[:25 - len(self.letras)]
+
+        self.digramas = list(tipos)
+        conteo_pares = {}
+        for par in zip(secuencia, secuencia[1:]):
+            conteo_pares[par] = conteo_pares.get(par, 0) + 1
+        self.pares = list(conteo_pares)
+        self.conteos = [conteo_pares[par] for par in self.pares]
+
+        # Digramas que contienen a cada letra, y pares que contienen a cada
+        # digrama.
+        self.por_letra = [set() for _ in range(26)]
+        for t, (x, y) in enumerate(self.digramas):
+            self.por_letra[x].add(t)
+            self.por_letra[y].add(t)
+        self.pares_de = [[] for _ in self.digramas]
+        for i, (t1, t2) in enumerate(self.pares):
+            self.pares_de[t1].append(i)
+            if t2 != t1:
+                self.pares_de[t2].append(i)
+        self.trigramas = tabla_log_probabilidades(3)
+        self.iteraciones = 0
+        self.segundos = 0
+
+    def descifra_digrama(self, cuadro, posiciones, t):
+        '''Descifra el digrama T con el cuadro especificado.
+
+        :param cuadro: el cuadro, como lista de 25 valores numéricos.
+        :param posiciones: la posición de cada letra en el cuadro.
+        :param t: el índice del digrama.
+        :returns: la tupla con los valores de las dos letras descifradas.'''
+
+        x, y = self.digramas[t]
+        r1, c1 = divmod(posiciones[x], 5)
+        r2, c2 = divmod(posiciones[y], 5)
+        if r1 == r2:
+            return (cuadro[r1 * 5 + (c1 - 1) % 5], cuadro[r1 * 5 + (c2 - 1) % 5])
+        elif c1 == c2:
+            return (cuadro[(r1 - 1) % 5 * 5 + c1], cuadro[(r2 - 1) % 5 * 5 + c1])
+        else:
+            return (cuadro[r1 * 5 + c2], cuadro[r2 * 5 + c1])
+
+    def puntaje_par(self, i, descifrados):
+        '''Calcula la contribución del par de digramas I al puntaje.
+
+        :param i: el índice del par de digramas consecutivos.
+        :param descifrados: el descifrado de cada digrama.
+        :returns: la suma de los logaritmos de los dos trigramas del par,
+                  multiplicada por las apariciones del par.'''
+
+        t1, t2 = self.pares[i]
+        a, b = descifrados[t1]
+        c, d = descifrados[t2]
+        tabla = self.trigramas
+        return self.conteos[i] * (tabla[a * 676 + b * 26 + c] + tabla[b * 676 + c * 26 + d])
+
+    def busca(self, rnd, iteraciones, temperatura, cuadro=None, detener=None):
+        '''Ejecuta una corrida de recocido simulado.
+
+        :param rnd: el generador de números aleatorios.
+        :param iteraciones: la cantidad de cambios de clave a probar.
+        :param temperatura: la temperatura inicial; desciende linealmente.
+        :param cuadro: el cuadro inicial (lista de 25 valores). Si no se
+               especifica, se usa un cuadro aleatorio.
+        :param detener: un evento (threading.Event o multiprocessing.Event)
+               que, al activarse, termina la corrida; se revisa cada 1024
+               iteraciones.
+        :returns: una tupla (puntaje, cuadro) con el mejor cuadro encontrado.'''
+
+        if cuadro is None:
+            cuadro = self.letras[:]
+            rnd.shuffle(cuadro)
+        cuadro = list(cuadro)
+        posiciones = [0] * 26
+        for i, l in enumerate(cuadro):
+            posiciones[l] = i
+
+        descifrados = [self.descifra_digrama(cuadro, posiciones, t) for t in range(len(self.digramas))]
+        por_plana = [set() for _ in range(26)]
+        for t, (a, b) in enumerate(descifrados):
+            por_plana[a].add(t)
+            por_plana[b].add(t)
+        contribuciones = [self.puntaje_par(i, descifrados) for i in range(len(self.pares))]
+        actual = sum(contribuciones)
+        mejor, mejor_cuadro = actual, cuadro[:]
+
+        descifra = self.descifra_digrama
+        pares, pares_de, conteos = self.pares, self.pares_de, self.conteos
+        tabla = self.trigramas
+        inicio = time.perf_counter()
+        hechas = iteraciones
+        for it in range(iteraciones):
+            if detener is not None and it % 1024 == 0 and detener.is_set():
+                hechas = it
+                break
+            t_actual = temperatura * (1 - it / iteraciones)
+            movimiento = rnd.random()
+            if movimiento < 0.9:
+                # Intercambio de dos letras: cambio incremental.
+                i, j = rnd.sample(range(25), 2)
+                a, b = cuadro[i], cuadro[j]
+                afectados = self.por_letra[a] | self.por_letra[b] | por_plana[a] | por_plana[b]
+                cuadro[i], cuadro[j] = b, a
+                posiciones[a], posiciones[b] = j, i
+            else:
+                # Intercambio de renglones, de columnas o transposición:
+                # se vuelven a descifrar todos los digramas.
+                anterior = cuadro[:]
+                cuadro[:] = mueve_cuadro(rnd, cuadro)
+                for k, l in enumerate(cuadro):
+                    posiciones[l] = k
+                afectados = range(len(self.digramas))
+
+            nuevos = {}
+            for t in afectados:
+                nuevo = descifra(cuadro, posiciones, t)
+                if nuevo != descifrados[t]:
+                    nuevos[t] = nuevo
+            viejos = {t: descifrados[t] for t in nuevos}
+            for t, v in nuevos.items():
+                descifrados[t] = v
+            indices = {p for t in nuevos for p in pares_de[t]}
+            cambios = []
+            delta = 0
+            for p in indices:
+                t1, t2 = pares[p]
+                x1, x2 = descifrados[t1]
+                x3, x4 = descifrados[t2]
+                valor = conteos[p] * (tabla[x1 * 676 + x2 * 26 + x3] + tabla[x2 * 676 + x3 * 26 + x4])
+                delta += valor - contribuciones[p]
+                cambios.append((p, valor))
+
+            if delta >= 0 or (t_actual > 0 and rnd.random() < math.exp(delta / t_actual)):
+                actual += delta
+                for p, v in cambios:
+                    contribuciones[p] = v
+                for t, (x1, x2) in viejos.items():
+                    por_plana[x1].discard(t)
+                    por_plana[x2].discard(t)
+                for t, (x1, x2) in nuevos.items():
+                    por_plana[x1].add(t)
+                    por_plana[x2].add(t)
+                if actual > mejor:
+                    mejor, mejor_cuadro = actual, cuadro[:]
+            else:
+                for t, v in viejos.items():
+                    descifrados[t] = v
+                if movimiento < 0.9:
+                    cuadro[i], cuadro[j] = a, b
+                    posiciones[a], posiciones[b] = i, j
+                else:
+                    cuadro[:] = anterior
+                    for k, l in enumerate(cuadro):
+                        posiciones[l] = k
+
+        self.iteraciones += hechas
+        self.segundos += time.perf_counter() - inicio
+        return (mejor, mejor_cuadro)
+
+    def iteraciones_por_segundo(self):
+        '''Devuelve la velocidad promedio de las búsquedas realizadas.
+
+        :returns: la cantidad de iteraciones por segundo.'''
+
+        return self.iteraciones / self.segundos if self.segundos > 0 else 0
+
+def mueve_cuadro(rnd, cuadro):
+    '''Aplica al cuadro un cambio aleatorio que no es un intercambio de
+    letras: intercambio de dos renglones, de dos columnas o transposición.
+
+    :param rnd: el generador de números aleatorios.
+    :param cuadro: el cuadro, como lista de 25 valores.
+    :returns: el nuevo cuadro.'''
+
+    renglones = [cuadro[i:i + 5] for i in range(0, 25, 5)]
+    movimiento = rnd.randrange(3)
+    if movimiento == 0:
+        i, j = rnd.sample(range(5), 2)
+        renglones[i], renglones[j] = renglones[j], renglones[i]
+    elif movimiento == 1:
+        i, j = rnd.sample(range(5), 2)
+        for r in renglones:
+            r[i], r[j] = r[j], r[i]
+    else:
+        renglones = [list(c) for c in zip(*renglones)]
+    return [l for r in renglones for l in r]
+
+def rompe_playfair(criptograma, reinicios=1, iteraciones=100000, temperatura=40,
+                   semilla=None, detener=None):
+    '''Intenta recuperar el cuadro de Playfair de un criptograma por recocido
+    simulado (ver RecocidoPlayfair). Cada reinicio parte de un cuadro
+    construido con construye_cuadro a partir de las letras del criptograma en
+    orden aleatorio, y se conserva el mejor resultado. Con los valores por
+    omisión, cripto4 se descifra en menos de un minuto.
+
+    :param criptograma: el texto cifrado con Playfair.
+    :param reinicios: la cantidad de corridas de recocido.
+    :param iteraciones: la cantidad de iteraciones de cada corrida.
+    :param temperatura: la temperatura inicial de cada corrida.
+    :param semilla: la semilla del generador de números aleatorios, para
+           reproducir la búsqueda.
+    :param detener: un evento que, al activarse, termina la búsqueda (ver
+           RecocidoPlayfair.busca).
+    :returns: una tupla (puntaje, cuadro, texto descifrado, iteraciones por
+              segundo).'''
+
+    rnd = random.Random(semilla)
+    recocido = RecocidoPlayfair(criptograma)
+    mejor = (-math.inf, None)
+    for _ in range(reinicios):
+        letras = [alfabeto_inverso[l].lower() for l in recocido.letras]
+        rnd.shuffle(letras)
+        inicial = [alfabeto[c] for renglon in construye_cuadro(''.join(letras)) for c in renglon]
+        mejor = max(mejor, recocido.busca(rnd, iteraciones, temperatura, inicial, detener),
+                    key=lambda r: r[0])
+
+    puntaje, valores = mejor
+    cuadro = [[alfabeto_inverso[valores[i * 5 + j]].lower() for j in range(5)] for i in range(5)]
+    return (puntaje, cuadro, descifrado_playfair(cuadro, criptograma),
+            recocido.iteraciones_por_segundo())
+
 cripto4 = 'YFGZRXFGBELFOJZLRNPHAFOBYFOHFGNPFPRXFNMYGNPQCVPEIZLEZNLFOKNTYDNTETBEMXNPRVNPLZGRLFOKRAOBOFECDKNVRANPPGPOEVFSFOOEOFMYPLRNNFYFPDASCEOFGNXRCENPRAONFCHOCPPNNGRNGBHMVNZQNFAFOBVNYNCEQAGEYFOHRGHJJZIGARBACPRALZOBRAOKTFOFIGKNFNCBARPNTMNTPNASFGEVYNHPFGFVASNPBEGIVINRDZASEVJZGZRXFGBEGKFNBPVFPKGBASNPPGAIOHRGHJJZIGRTVHLFZVASNPBEBOVEEBVSGZLZGBPDECPAMVFONPHPZAKEFNMVNPGBPDNPAPNPBEEVTMFRFSLPOVXQNFNPTENFPHOHIBAIGZRXFGBEPNNFTENFPLPKPFQEDPAPNPMXFOXFFAPAOBTNECTPFOFNNTGZPHLZBUOFIGMXNPNOEJRVRAMZGNPQGPRADBHMDKBOKERNEIRNGEIDNFPFETAPNORAIGMNFXPGMCAIZLOVXQNFDXRABGDPBPVHRNNTIVEBZEPDMKNGRNYFQAZLEIFNRTVFHZAOCEDINZFGKPDYPKCENPMZPAMXFOFNNTGBAKBPVFPNBNOVPCRXAIZLOVXQNFZYVCGBAKBPVFBNAVGNOFGRIBOFAIGZAIOHRGIGIVYKBPVFAIGZRXFGBERNRGBCCVOHIBMXAIVIFNNOLENPMZIVFCEVGLNFPGIVEBAIGZRXFGBEPNNRLETENFMYGNIEPAIEXJVFIGMXFIRGLEPNQDNFOBRNFAAFCBTKIADBGZVIBGFGAINGCPNOLFVNHGLEGJGETENROKGENRGBOANQVMFNPAIVEBECRAGBASEBRARTVFKGFTIETFTSVFGZMKBINTFTFNJHGZKSTFNBIJLZKSAIGZRXFGBERAGNQDOEPNMVPCNGEZFNSKNGDPYDIDKYRGCPHMUKRNPDPCQCVFECNPLZPVUTFINTAZAFOBOHIBAIOHRGIGIVEBRAFGAIFAPAECPAZETNDXAJFNOFPHPFMXFOFNNOCEIGMXNONRYGFGRORLBOAIZLOVXQNFZSYDCEIGOFRAOKTFHMXCOVFCRFDYRNOBOHIBAIGZRXFGBEJZIADBGZVIBGFGAINTOVQDNFVNJZGZRXFGBERAHZAZFBNPFPRXFNGPNFPVYARGCPPNQDEBQALOEVGLEJDBTFFMEBVNJZGZRXFGBEUMRFMYGNPQCVIGPNDBFNNTOFKTVFIGSNZFFCEPKEEVHGLEGJCEEVYNCEQADPNTMXRNNTQABICPUCAIFNRGLEMXAIFOOEPNPLEBOFGNORTZIEFXESNROKIOOKGEPKPNRAAZAFZGNTVGXQNFMCJKEVJZGZRXFGBEEJRAOBPNSKAIIAPEAIQALOCVAIPAPCEBOFHGLEGJBV'
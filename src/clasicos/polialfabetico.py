@@ -2,6 +2,9 @@
 Funciones para descifrar un cifrado polialfabético (Vigenère).
 '''
 
+import math
+from collections import Counter
+
 from monoalfabetico import *
 
 # ------------------------------------------------------------------------------
@@ -15,16 +18,8 @@ def cifrado_vigenere(texto, clave):
     :param clave: la clave de cifrado.
     :returns: el texto cifrado.'''
 
-    long_clave = len(clave)
     valores_clave = [alfabeto[c] for c in clave]
-    text_grupos = ' '.join(texto[i:i + long_clave] for i in range(0, len(texto), long_clave))
-    grupos = text_grupos.split()
-    cifrado = ''
-    for grupo in grupos:
-        for i in range(len(grupo)):
-            nueva_letra = evalua_afin(alfabeto[grupo[i]], 1, valores_clave[i])
-            cifrado += alfabeto_inverso[nueva_letra].lower()
-    return cifrado
+    return vigenere_bytes(valida_minusculas(texto), valores_clave).decode('ascii')
 
 def descifrado_vigenere(texto, clave):
     '''Descifra un mensaje cifrado con el cifrado de Vigenère, usando la
@@ -35,11 +30,112 @@ def descifrado_vigenere(texto, clave):
     :returns: una cadena que representa el texto descifrado.'''
 
     valores_clave = [congruente_mod26(alfabeto[c] * (-1)) for c in clave]
-    # clave_descifrado codifica los desplazamientos inversos a la clave original.
-    clave_descifrado = ''
-    for n in valores_clave:
-        clave_descifrado += alfabeto_inverso[n]
-    return cifrado_vigenere(texto, clave_descifrado.lower())
+    return vigenere_bytes(valida_minusculas(texto), valores_clave).decode('ascii')
+
+def romper_vigenere(texto, longitud_maxima=20):
+    '''Rompe un cifrado de Vigenère sin conocer la clave. La longitud de la
+    clave se elige con el índice de coincidencias promedio de las columnas
+    (ver longitudes_clave) y cada letra de la clave con la chi cuadrada de su
+    columna contra el español (ver letra_clave).
+
+    :param texto: el texto cifrado; se limpia con limpiar_texto.
+    :param longitud_maxima: la longitud máxima de clave a considerar.
+    :returns: una tupla (clave, texto descifrado).
+    :raises ValueError: si el texto tiene menos de dos letras, con lo que no
+            hay ninguna longitud de clave que calificar.'''
+
+    limpio = limpiar_texto(texto)
+    candidatas = longitudes_clave(limpio, longitud_maxima)
+    if not candidatas:
+        raise ValueError('El texto es demasiado corto para estimar la longitud de la clave.')
+    # Los múltiplos de la longitud correcta también tienen un índice alto; se
+    # elige la menor longitud cuyo índice sea cercano al mejor.
+    mejor_ic = max(ic for ic, _ in candidatas)
+    longitud = min(l for ic, l in candidatas if ic >= 0.9 * mejor_ic)
+
+    clave = ''.join(letra_clave(Histograma.desde_texto(limpio[i::longitud]))
+                    for i in range(longitud))
+    return (clave, descifrado_vigenere(limpio, clave))
+
+def longitudes_clave(texto, longitud_maxima=20):
+    '''Califica las posibles longitudes de clave de un texto cifrado con
+    Vigenère. Para cada longitud L, el texto se separa en L columnas (las
+    letras cifradas con la misma letra de la clave) y se promedia su índice
+    de coincidencias: con la longitud correcta cada columna es un cifrado
+    monoalfabético y su índice se acerca al del español.
+
+    :param texto: el texto cifrado, limpio.
+    :param longitud_maxima: la longitud máxima de clave a considerar.
+    :returns: una lista de tuplas (índice promedio, longitud), ordenada de
+              mayor a menor índice.'''
+
+    candidatas = []
+    for longitud in range(1, min(longitud_maxima, len(texto) // 2) + 1):
+        ic = sum(Histograma.desde_texto(texto[i::longitud]).indice_coincidencias()
+                 for i in range(longitud)) / longitud
+        candidatas.append((ic, longitud))
+    return sorted(candidatas, reverse=True)
+
+def letra_clave(histograma):
+    '''Encuentra el desplazamiento con el que se cifró una columna de un
+    texto cifrado con Vigenère. Para cada uno de los 26 desplazamientos, los
+    conteos de la columna descifrada son los mismos conteos rotados, así que
+    no es necesario descifrar la columna.
+
+    :param histograma: el histograma de las letras de la columna.
+    :returns: la letra de la clave cuya chi cuadrada contra el español es
+              mínima.'''
+
+    conteos = list(histograma.conteos)
+    chis = [chi_cuadrada(conteos[k:] + conteos[:k]) for k in range(26)]
+    return alfabeto_inverso[chis.index(min(chis))].lower()
+
+def vigenere_bytes(datos, desplazamientos, en_sitio=False, fase=0, bloque=1 << 20):
+    '''Aplica los desplazamientos de una clave de Vigenère a un texto en bytes
+    (letras minúsculas ASCII). El texto se procesa por bloques de tamaño
+    múltiplo de la longitud de la clave: cada bloque se lee como un solo
+    entero, se le suma el entero formado por la clave repetida (cada letra
+    ocupa un byte y la suma nunca pasa de 255, así que no hay acarreo entre
+    bytes) y el resultado se reduce módulo 26 con una tabla de traducción.
+
+    :param datos: el texto, como bytes, bytearray o memoryview; no se copia.
+    :param desplazamientos: los valores numéricos (0 a 25) de la clave.
+    :param en_sitio: si es True, el resultado se escribe sobre DATOS (que debe
+           poder escribirse) en lugar de crear un objeto nuevo.
+    :param fase: la posición de la clave con la que inicia el texto; permite
+           procesar un texto largo por partes.
+    :param bloque: el tamaño aproximado de los bloques, en bytes.
+    :returns: el texto resultante como bytes, o DATOS si en_sitio es True.'''
+
+    vista = memoryview(datos).cast('B')
+    longitud = len(desplazamientos)
+    fase = fase % longitud
+    desplazamientos = list(desplazamientos[fase:]) + list(desplazamientos[:fase])
+    tamanno = max(bloque // longitud, 1) * longitud
+    patron = bytes(desplazamientos) * (tamanno // longitud)
+    clave_entera = int.from_bytes(patron, 'big')
+
+    salida = vista if en_sitio else bytearray(len(vista))
+    for inicio in range(0, len(vista), tamanno):
+        parte = vista[inicio:inicio + tamanno]
+        n = len(parte)
+        sumando = clave_entera if n == tamanno else int.from_bytes(patron[:n], 'big')
+        suma = int.from_bytes(parte, 'big') + sumando
+        salida[inicio:inicio + n] = suma.to_bytes(n, 'big').translate(tabla_vigenere)
+    return datos if en_sitio else bytes(salida)
+
+def valida_minusculas(texto):
+    '''Convierte el texto a bytes, verificando que sólo tenga letras
+    minúsculas del alfabeto de 26 letras.
+
+    :param texto: el texto a convertir.
+    :returns: el texto como bytes ASCII.
+    :raises ValueError: si el texto contiene otros caracteres.'''
+
+    datos = texto.encode('ascii', 'replace')
+    if len(datos.translate(None, no_letras_minusculas)) != len(datos):
+        raise ValueError('El texto sólo debe contener letras minúsculas, sin espacios.')
+    return datos
 
 # ------------------------------------------------------------------------------
 # --                               AUXILIARES                                 --
@@ -83,18 +179,8 @@ def primos(val):
     :param val: el valor máximo del rango sobre el que se obtendrán los números
            primos.
     :returns: la lista de primos en el rango de 0 hasta el valor.'''
-    
-    lista_primos = []
-    for i in range(val):
-        if i == 0 or i == 1:
-            continue
-        else:
-            for j in range(2, int(i / 2) + 1):
-                if i % j == 0:
-                    break
-            else:
-                lista_primos.append(i)
-    return lista_primos
+
+    return criba_factores.primos(val)
 
 def factores(num):
     '''Obtiene la lista de factores primos de un número.
@@ -102,15 +188,86 @@ def factores(num):
     :param num: el valor numérico al que se le obtendrán sus factores primos.
     :returns: una lista de los factores primos del número.'''
 
-    factores = []
-    lista_primos = primos(num + 1)
-    for p in lista_primos:
-        if num == 1:
-            break
-        while num % p == 0:
+    return criba_factores.factoriza(num)
+
+class CribaFactores:
+    '''Criba del menor factor primo. Para cada entero hasta el límite de la
+    criba guarda su menor factor primo, de modo que factorizar un número se
+    reduce a dividirlo repetidamente entre el factor guardado: O(log n)
+    divisiones. La criba se construye hasta donde se necesita y se vuelve a
+    construir, al menos al doble de tamaño, cuando se pide un número mayor.'''
+
+    def __init__(self, limite=0):
+        '''Inicializa la criba.
+
+        :param limite: el número más grande que se puede factorizar sin
+               volver a construir la criba.'''
+
+        self.menor_factor = [0, 1]
+        self.limite = 1
+        self.asegura(limite)
+
+    def asegura(self, limite):
+        '''Construye la criba hasta el límite especificado, si aún no llega.
+
+        :param limite: el número más grande que se necesita factorizar.'''
+
+        if limite <= self.limite:
+            return
+        limite = max(limite, 2 * self.limite)
+        menor_factor = list(range(limite + 1))
+        raiz = math.isqrt(limite)
+        es_primo = bytearray([1]) * (raiz + 1)
+        primos_raiz = []
+        for p in range(2, raiz + 1):
+            if es_primo[p]:
+                primos_raiz.append(p)
+                es_primo[p * p::p] = bytes(len(range(p * p, raiz + 1, p)))
+        # Los primos se recorren de mayor a menor, así el último que marca a
+        # cada múltiplo es su menor factor primo.
+        for p in reversed(primos_raiz):
+            menor_factor[p * p::p] = [p] * len(range(p * p, limite + 1, p))
+        self.menor_factor = menor_factor
+        self.limite = limite
+
+    def factoriza(self, num):
+        '''Obtiene la lista de factores primos de un número, de menor a
+        mayor y con repeticiones.
+
+        :param num: el número a factorizar.
+        :returns: la lista de factores primos; vacía si num es menor que 2.'''
+
+        if num < 2:
+            return []
+        self.asegura(num)
+        menor_factor = self.menor_factor
+        factores = []
+        while num > 1:
+            p = menor_factor[num]
             factores.append(p)
-            num = num // p
-    return factores
+            num //= p
+        return factores
+
+    def divisores(self, num):
+        '''Obtiene los divisores de un número a partir de su factorización.
+
+        :param num: un número positivo.
+        :returns: la lista ordenada de divisores del número.'''
+
+        divisores = [1]
+        for p, exponente in Counter(self.factoriza(num)).items():
+            divisores = [d * p ** e for d in divisores for e in range(exponente + 1)]
+        return sorted(divisores)
+
+    def primos(self, val):
+        '''Obtiene la lista de primos menores que el valor especificado.
+
+        :param val: el límite (exclusivo) del rango.
+        :returns: la lista de primos menores que val.'''
+
+        self.asegura(val - 1)
+        menor_factor = self.menor_factor
+        return [i for i in range(2, val) if menor_factor[i] == i]
 
 def diferencias(lista):
     '''Calcula la diferencia entre cada par contiguo de valores en la lista
@@ -132,32 +289,177 @@ def indice_coincidencias(texto):
 
     :param texto: el texto sobre el que se calculará el índice de coincidencias.'''
 
-    longitud = len(texto)
-    f_texto = frecuencias(texto)
-    ic = 0;
-    for frec in f_texto.values():
-        ic += (frec * (frec - 1)) / (longitud * (longitud - 1))
-    return ic
+    return Histograma.desde_texto(texto).indice_coincidencias()
 
 # Las siguientes funciones se ejecutan una tras otra, en orde, para hallar la
 # factorización de las distancias de cadenas repetidas.
 
+def arreglo_sufijos(texto):
+    '''Construye el arreglo de sufijos del texto especificado, duplicando en
+    cada ronda la longitud de los prefijos comparados. Toma tiempo
+    O(n log^2 n) en el peor caso; en textos naturales bastan pocas rondas.
+
+    :param texto: la cadena de la que se obtendrá el arreglo de sufijos.
+    :returns: la lista de posiciones iniciales de los sufijos del texto, en
+              orden lexicográfico.'''
+
+    n = len(texto)
+    rangos = [ord(c) for c in texto]
+    sufijos = sorted(range(n), key=rangos.__getitem__)
+    k = 1
+    while n > 1:
+        # Cada sufijo se identifica por el par (rango de su prefijo de
+        # longitud k, rango del prefijo de longitud k que le sigue), empacado
+        # en un solo entero para ordenar rápido.
+        base = max(rangos) + 2
+        siguientes = rangos[k:] + [-1] * min(k, n)
+        claves = [r * base + s + 1 for r, s in zip(rangos, siguientes)]
+        sufijos.sort(key=claves.__getitem__)
+
+        nuevos = [0] * n
+        rango = 0
+        anterior = claves[sufijos[0]]
+        for i in sufijos:
+            if claves[i] != anterior:
+                rango += 1
+                anterior = claves[i]
+            nuevos[i] = rango
+        rangos = nuevos
+        if rango == n - 1:    # Todos los sufijos ya son distintos.
+            break
+        k *= 2
+    return sufijos
+
+def arreglo_lcp(texto, sufijos):
+    '''Construye el arreglo de prefijos comunes más largos (LCP) con el
+    algoritmo de Kasai, en tiempo O(n).
+
+    :param texto: la cadena de la que se obtuvo el arreglo de sufijos.
+    :param sufijos: el arreglo de sufijos del texto.
+    :returns: una lista LCP tal que LCP[i] es la longitud del prefijo común
+              más largo entre los sufijos sufijos[i - 1] y sufijos[i]
+              (LCP[0] = 0).'''
+
+    n = len(texto)
+    lcp = [0] * n
+    rangos = [0] * n
+    for i, pos in enumerate(sufijos):
+        rangos[pos] = i
+    h = 0
+    for pos in range(n):
+        r = rangos[pos]
+        if r == 0:
+            h = 0
+            continue
+        anterior = sufijos[r - 1]
+        while pos + h < n and anterior + h < n and texto[pos + h] == texto[anterior + h]:
+            h += 1
+        lcp[r] = h
+        if h > 0:
+            h -= 1
+    return lcp
+
+def repetidas_maximales(texto):
+    '''Encuentra las subcadenas repetidas maximales del texto junto con los
+    índices en los que aparecen, usando el arreglo de sufijos y el arreglo LCP.
+    Una subcadena se considera repetida si tiene longitud al menos 2 y aparece
+    al menos dos veces sin traslaparse (igual que con str.count); es maximal
+    si no es subcadena de otra subcadena repetida.
+
+    Cada intervalo LCP agrupa las apariciones de una subcadena; basta revisar,
+    para cada intervalo, si la subcadena más larga que se repite sin traslape
+    puede extenderse un caracter a la izquierda o a la derecha.
+
+    :param texto: la cadena sobre la cual se van a buscar las repeticiones.
+    :returns: un diccionario que asocia cada subcadena repetida maximal con la
+              lista de índices (sin traslape) en los que aparece, en el mismo
+              formato que repetidas_pos.'''
+
+    n = len(texto)
+    sufijos = arreglo_sufijos(texto)
+    lcp = arreglo_lcp(texto, sufijos)
+    reps = {}
+
+    # Recorrido ascendente de los intervalos LCP; cada elemento de la pila es
+    # el par (lcp del intervalo, límite izquierdo).
+    pila = [(0, 0)]
+    for i in range(1, n + 1):
+        actual = lcp[i] if i < n else 0
+        izq = i - 1
+        while actual < pila[-1][0]:
+            longitud, izq = pila.pop()
+            padre = max(actual, pila[-1][0])
+            cadena, posiciones = repetida_intervalo(texto, sufijos[izq:i], longitud, padre)
+            if cadena is not None:
+                reps[cadena] = posiciones
+        if actual > pila[-1][0]:
+            pila.append((actual, izq))
+    return dict(sorted(reps.items(), key=lambda par: par[1][0]))
+
+def repetida_intervalo(texto, posiciones, longitud, padre):
+    '''Determina si el intervalo LCP especificado corresponde con una
+    subcadena repetida maximal. Auxiliar de repetidas_maximales.
+
+    :param texto: el texto analizado.
+    :param posiciones: las posiciones de los sufijos del intervalo.
+    :param longitud: el prefijo común de los sufijos del intervalo.
+    :param padre: el prefijo común del intervalo que contiene a éste.
+    :returns: una tupla (cadena, índices sin traslape), o (None, None) si el
+              intervalo no corresponde con una subcadena repetida maximal.'''
+
+    # Dos apariciones no se traslapan si están a distancia mayor o igual que
+    # la longitud de la subcadena.
+    extension = max(posiciones) - min(posiciones)
+    largo = min(longitud, extension)
+    if largo < 2 or largo <= padre:
+        return (None, None)
+
+    if largo == longitud and se_extiende(posiciones, largo + 1,
+                                         lambda p: texto[p + longitud] if p + longitud < len(texto) else None):
+        return (None, None)
+    if se_extiende(posiciones, largo + 1,
+                   lambda p: texto[p - 1] if p > 0 else None):
+        return (None, None)
+
+    no_traslapadas = []
+    for p in sorted(posiciones):
+        if not no_traslapadas or p >= no_traslapadas[-1] + largo:
+            no_traslapadas.append(p)
+    return (texto[no_traslapadas[0]:no_traslapadas[0] + largo], no_traslapadas)
+
+def se_extiende(posiciones, minimo, vecino):
+    '''Verifica si alguna extensión de un caracter de la subcadena sigue
+    repitiéndose sin traslape. Auxiliar de repetida_intervalo.
+
+    :param posiciones: las posiciones de las apariciones de la subcadena.
+    :param minimo: la distancia mínima entre apariciones de la extensión
+           para que no se traslapen.
+    :param vecino: una función que devuelve el caracter que extiende a la
+           aparición en la posición dada, o None si no existe.
+    :returns: True si alguna extensión se repite sin traslape, False en otro
+              caso.'''
+
+    extremos = {}
+    for p in posiciones:
+        c = vecino(p)
+        if c is None:
+            continue
+        menor, mayor = extremos.get(c, (p, p))
+        extremos[c] = (min(menor, p), max(mayor, p))
+    return any(mayor - menor >= minimo for menor, mayor in extremos.values())
+
 def repetidas(texto):
-    '''Encuentra todas las subcadenas repetidas de la cadena especificada,
-    indicando además cuántas veces aparece. Este algoritmo toma tiempo O(n^3),
-    por lo que no se recomienda para textos muy largos.
+    '''Encuentra todas las subcadenas repetidas maximales de la cadena
+    especificada (de longitud al menos 2 y que no son subcadena de otra
+    subcadena repetida), indicando además cuántas veces aparece. Usa el arreglo
+    de sufijos del texto, por lo que toma tiempo O(n log n) y puede aplicarse
+    a textos completos.
 
     :param texto: la cadena sobre la cual se van a buscar las repeticiones.
     :returns: un diccionario que asocia cada subcadena repetida con el número de
               veces que aparece en el texto.'''
 
-    frecs = {}
-    subcadenas = [texto[i:j] for i in range(len(texto)) for j in range(i + 1, len(texto) + 1)]
-    for s in subcadenas:
-        frecs[s] = texto.count(s)
-    frecs = {k: v for k, v in frecs.items() if v >= 2 and len(k) >= 2}
-    frecs = {k: v for k, v in frecs.items() if not subcadena_lista(k, frecs.keys())}
-    return frecs
+    return {cadena: len(pos) for cadena, pos in repetidas_maximales(texto).items()}
 
 def repetidas_pos(texto, frecs):
     '''Asocia cada subcadena en frecs con los índices en los que aparece dentro
@@ -191,11 +493,43 @@ def factores_difs(difs):
     :returns: un diccionario que asocia cada cadena con los factores primos de
               las distancias entre apariciones de las cadenas en un texto.'''
 
-    facts = {}
-    for cadena in difs.keys():
-        valores = difs[cadena]
-        fac_dif = []
-        for val in valores:
-            fac_dif.append(factores(val))
-        facts[cadena] = fac_dif
-    return facts
+    # La criba se construye una sola vez, hasta la distancia más grande.
+    criba_factores.asegura(max((max(v) for v in difs.values() if v), default=0))
+    return {cadena: [criba_factores.factoriza(val) for val in valores]
+            for cadena, valores in difs.items()}
+
+def resumen_distancias(difs, maximo=20):
+    '''Resume las distancias entre apariciones de subcadenas repetidas: su
+    máximo común divisor y cuántas distancias son múltiplo de cada posible
+    longitud de clave. En el método de Kasiski la longitud de la clave suele
+    ser el divisor que más se repite (o un múltiplo suyo).
+
+    :param difs: un diccionario que asocia cadenas con las diferencias de
+           aparición, como el que devuelve repetidas_difs.
+    :param maximo: la longitud de clave más grande que se considera.
+    :returns: una tupla (mcd, histograma), donde histograma asocia cada
+              divisor entre 2 y maximo con la cantidad de distancias que son
+              múltiplo suyo, ordenado de mayor a menor cantidad.'''
+
+    distancias = Counter(d for valores in difs.values() for d in valores if d > 0)
+    mcd = math.gcd(*distancias)
+    histograma = dict.fromkeys(range(2, maximo + 1), 0)
+    for distancia, veces in distancias.items():
+        for divisor in criba_factores.divisores(distancia):
+            if divisor > maximo:
+                break
+            if divisor > 1:
+                histograma[divisor] += veces
+    return mcd, dict(sorted(histograma.items(), key=lambda par: par[1], reverse=True))
+
+# ------------------------------------------------------------------------------
+# --                            CONSTANTES                                    --
+# ------------------------------------------------------------------------------
+
+# Reduce módulo 26 las letras minúsculas desplazadas (de 'a' a 'a' + 50).
+tabla_vigenere = bytes(ord('a') + (i - ord('a')) % 26 if i >= ord('a') else i
+                       for i in range(256))
+no_letras_minusculas = bytes(i for i in range(256) if chr(i) not in alfabeto)
+
+# Criba compartida por factores y factores_difs; crece conforme se necesita.
+criba_factores = CribaFactores()
@@ -0,0 +1,275 @@
+'''
+Mediciones de rendimiento de los cifrados clásicos. Se ejecuta igual que
+cifrados.py, desde el directorio src/clasicos:
+
+    python3 rendimiento.py
+'''
+
+from timeit import timeit
+
+import hill
+import monoalfabetico
+import playfair
+import polialfabetico
+
+def mide(funcion, repeticiones=1):
+    '''Mide el tiempo promedio de ejecución de la función especificada.
+
+    :param funcion: una función sin argumentos.
+    :param repeticiones: la cantidad de veces que se ejecutará la función.
+    :returns: el tiempo promedio, en segundos.'''
+
+    return timeit(funcion, number=repeticiones) / repeticiones
+
+def reporta(nombre, t_original, t_nuevo):
+    '''Imprime la comparación de tiempos entre dos implementaciones.
+
+    :param nombre: el nombre de la operación medida.
+    :param t_original: el tiempo de la implementación original, en segundos.
+    :param t_nuevo: el tiempo de la implementación nueva, en segundos.'''
+
+    print(f'{nombre}: original {t_original:.3f} s, nuevo {t_nuevo:.4f} s '
+          f'({t_original / t_nuevo:.0f}x)')
+
+with open('./../../data/Texto1.txt', 'r') as archivo:
+    noticia = monoalfabetico.limpiar_texto(archivo.read())
+
+# ------------------------------------------------------------------------------
+# --                       CIFRADO MONOALFABETICO                             --
+# ------------------------------------------------------------------------------
+
+def cifrado_monoalfabetico_por_caracter(texto, coef_A, coef_B):
+    '''Implementación original del cifrado afín, caracter por caracter. Se
+    conserva como referencia para las mediciones.'''
+
+    criptograma = ''
+    for c in texto:
+        indice_c = monoalfabetico.alfabeto[c]
+        nuevo_indice = monoalfabetico.evalua_afin(indice_c, coef_A, coef_B)
+        criptograma += monoalfabetico.alfabeto_inverso[nuevo_indice]
+    return criptograma
+
+texto_grande = noticia * 1000
+print('Texto de', len(texto_grande), 'caracteres (Texto1.txt x 1000).')
+
+t_original = mide(lambda: cifrado_monoalfabetico_por_caracter(texto_grande, 19, 2))
+t_nuevo = mide(lambda: monoalfabetico.cifrado_monoalfabetico(texto_grande, 19, 2), 5)
+reporta('Cifrado afín', t_original, t_nuevo)
+
+criptograma = monoalfabetico.cifrado_monoalfabetico(texto_grande, 19, 2)
+t_nuevo = mide(lambda: monoalfabetico.descifrado_monoalfabetico(criptograma, 19, 2), 5)
+print(f'Descifrado afín: nuevo {t_nuevo:.4f} s')
+
+def fuerza_bruta_afin_descifrando(texto):
+    '''Fuerza bruta afín que descifra el texto con cada una de las 312
+    funciones y calcula la chi cuadrada del resultado. Se conserva como
+    referencia para las mediciones.'''
+
+    intentos = []
+    for coef_A, coef_B in monoalfabetico.claves_afines:
+        intento = monoalfabetico.descifrado_monoalfabetico(texto, coef_A, coef_B)
+        conteos = monoalfabetico.Histograma.desde_texto(intento).conteos
+        intentos.append((monoalfabetico.chi_cuadrada(conteos), (coef_A, coef_B)))
+    return min(intentos)
+
+def congruente_mod26_por_sumas(a):
+    '''Implementación original de congruente_mod26, que suma 26 hasta que un
+    valor negativo deja de serlo. Se conserva como referencia para las
+    mediciones.'''
+
+    while a < 0:
+        a += 26
+    return a % 26
+
+def inverso_por_busqueda(a):
+    '''Implementación original de inverso, buscando el inverso entre los 26
+    residuos. Se conserva como referencia para las mediciones.'''
+
+    for i in range(0, 26):
+        if congruente_mod26_por_sumas(a * i) == 1:
+            return i
+
+t_original = mide(lambda: congruente_mod26_por_sumas(-26 * 10 ** 6 - 7), 10)
+t_nuevo = mide(lambda: monoalfabetico.congruente_mod26(-26 * 10 ** 6 - 7), 10000)
+reporta('Reducción módulo 26 de un negativo grande', t_original, t_nuevo)
+
+t_original = mide(lambda: [inverso_por_busqueda(a) for a in monoalfabetico.coprimos_26], 1000)
+t_nuevo = mide(lambda: [monoalfabetico.inverso(a) for a in monoalfabetico.coprimos_26], 1000)
+reporta('Inversos módulo 26', t_original, t_nuevo)
+
+mensaje_corto = criptograma[:200]
+t_original = mide(lambda: fuerza_bruta_afin_descifrando(mensaje_corto), 10)
+t_nuevo = mide(lambda: monoalfabetico.descifrado_afin_por_puntaje(mensaje_corto, 1), 1000)
+reporta('Fuerza bruta afín, 200 letras', t_original, t_nuevo)
+
+def limpiar_texto_por_reemplazos(texto):
+    '''Implementación original de limpiar_texto, con un reemplazo por cada
+    símbolo. Se conserva como referencia para las mediciones.'''
+
+    nuevo_texto = texto.lower().replace('\n', ' ')
+    for simbolo in ' :.,«»()-':
+        nuevo_texto = nuevo_texto.replace(simbolo, '')
+    for acento, letra in zip('áéíóú', 'aeiou'):
+        nuevo_texto = nuevo_texto.replace(acento, letra)
+    return nuevo_texto.replace('ñ', 'nn')
+
+with open('./../../data/Texto1.txt', 'r') as archivo:
+    noticia_grande = archivo.read() * 1000
+t_original = mide(lambda: limpiar_texto_por_reemplazos(noticia_grande))
+t_nuevo = mide(lambda: monoalfabetico.limpiar_texto(noticia_grande))
+reporta('Limpieza del texto', t_original, t_nuevo)
+
+def frecuencias_por_caracter(texto):
+    '''Implementación original de frecuencias, caracter por caracter. Se
+    conserva como referencia para las mediciones.'''
+
+    tabla_frec = {}
+    for c in texto:
+        if c not in tabla_frec:
+            tabla_frec[c] = 1
+        else:
+            tabla_frec[c] += 1
+    return tabla_frec
+
+t_original = mide(lambda: frecuencias_por_caracter(texto_grande))
+t_nuevo = mide(lambda: monoalfabetico.Histograma.desde_texto(texto_grande).indice_coincidencias())
+reporta('Histograma e índice de coincidencias', t_original, t_nuevo)
+
+# ------------------------------------------------------------------------------
+# --                          CIFRADO DE VIGENERE                             --
+# ------------------------------------------------------------------------------
+
+def cifrado_vigenere_por_caracter(texto, clave):
+    '''Implementación original del cifrado de Vigenère, caracter por
+    caracter. Se conserva como referencia para las mediciones.'''
+
+    valores_clave = [monoalfabetico.alfabeto[c] for c in clave]
+    criptograma = []
+    for i, c in enumerate(texto):
+        valor = monoalfabetico.alfabeto[c] + valores_clave[i % len(clave)]
+        criptograma.append(monoalfabetico.alfabeto_inverso[valor % 26])
+    return ''.join(criptograma)
+
+t_original = mide(lambda: cifrado_vigenere_por_caracter(texto_grande, 'dinamitabb'))
+t_nuevo = mide(lambda: polialfabetico.cifrado_vigenere(texto_grande, 'dinamitabb'), 5)
+reporta('Cifrado de Vigenère', t_original, t_nuevo)
+
+buffer = bytearray(texto_grande.encode('ascii'))
+t_sitio = mide(lambda: polialfabetico.vigenere_bytes(buffer, [3, 8, 13], en_sitio=True), 5)
+print(f'Vigenère en sitio sobre bytearray: {t_sitio:.4f} s')
+
+def primos_por_division(val):
+    '''Implementación original de primos, por división de prueba hasta la
+    mitad de cada número. Se conserva como referencia para las mediciones.'''
+
+    lista_primos = []
+    for i in range(2, val):
+        for j in range(2, int(i / 2) + 1):
+            if i % j == 0:
+                break
+        else:
+            lista_primos.append(i)
+    return lista_primos
+
+def factores_por_division(num):
+    '''Implementación original de factores, que obtiene primero todos los
+    primos hasta el número (ver primos_por_division). Se conserva como
+    referencia para las mediciones.'''
+
+    lista_factores = []
+    for p in primos_por_division(num + 1):
+        if num == 1:
+            break
+        while num % p == 0:
+            lista_factores.append(p)
+            num = num // p
+    return lista_factores
+
+criptograma_poli = polialfabetico.cifrado_vigenere(noticia, 'dinamitabb')
+distancias = polialfabetico.repetidas_difs(polialfabetico.repetidas_pos(
+    criptograma_poli, polialfabetico.repetidas(criptograma_poli)))
+t_original = mide(lambda: {c: [factores_por_division(d) for d in v] for c, v in distancias.items()})
+t_nuevo = mide(lambda: polialfabetico.factores_difs(distancias), 5)
+reporta('Factores de las distancias de Kasiski', t_original, t_nuevo)
+
+# ------------------------------------------------------------------------------
+# --                            CIFRADO DE HILL                               --
+# ------------------------------------------------------------------------------
+
+def intento_hill_original(matriz, extracto):
+    '''Trabajo que hace la fuerza bruta original por cada matriz invertible.'''
+
+    intento = hill.descifrado_hill(*matriz, extracto).lower()
+    lista_frec = monoalfabetico.frecuencias(intento)
+    sorted(lista_frec, key=lista_frec.get, reverse=True)
+    polialfabetico.indice_coincidencias(intento)
+
+extracto = hill.s.replace(' ', '')
+invertibles = [(i, j, k, m) for i in range(26) for j in range(26) for k in range(26)
+               for m in range(26) if (i * m - j * k) % 26 in monoalfabetico.coprimos_26]
+muestra = invertibles[::len(invertibles) // 500]
+
+# La fuerza bruta original toma minutos; se estima a partir de una muestra.
+t_muestra = mide(lambda: [intento_hill_original(m, extracto) for m in muestra])
+t_original = t_muestra * len(invertibles) / len(muestra)
+t_nuevo = mide(lambda: hill.descifrado_hill_por_lotes(hill.s, 10, 'ic'))
+reporta('Fuerza bruta de Hill 2x2 (original estimado)', t_original, t_nuevo)
+
+t_renglones = mide(lambda: hill.descifrado_hill_por_renglones(hill.s, 2))
+reporta('Búsqueda por renglones de Hill 2x2 (contra lotes)', t_nuevo, t_renglones)
+
+def cifrado_hill_por_digrama(a, b, c, d, s):
+    '''Implementación original del cifrado de Hill de 2x2, digrama por
+    digrama. Se conserva como referencia para las mediciones.'''
+
+    cifradas = []
+    for graf in hill.separa_grafias(s.replace(' ', '').lower(), 2):
+        val_a = monoalfabetico.alfabeto[graf[0]]
+        val_b = monoalfabetico.alfabeto[graf[1]]
+        cifradas.append(monoalfabetico.alfabeto_inverso[(a * val_a + b * val_b) % 26]
+                        + monoalfabetico.alfabeto_inverso[(c * val_a + d * val_b) % 26])
+    return ''.join(cifradas)
+
+texto_10mb = (noticia * (10 * 2 ** 20 // len(noticia) + 1))[:10 * 2 ** 20]
+t_original = mide(lambda: cifrado_hill_por_digrama(3, 5, 2, 7, texto_10mb))
+t_nuevo = mide(lambda: hill.cifrado_hill(3, 5, 2, 7, texto_10mb))
+reporta('Cifrado de Hill 2x2, 10 MB', t_original, t_nuevo)
+
+for n in range(2, 9):
+    # Matriz triangular con unos en la diagonal: siempre es invertible.
+    matriz = [[1 if i == j else (3 * i + 5 * j) % 26 if j > i else 0 for j in range(n)]
+              for i in range(n)]
+    cifrado = hill.CifradoHill(matriz)
+    t_cifrado = mide(lambda: cifrado.cifra(texto_10mb))
+    criptograma = cifrado.cifra(texto_10mb)
+    t_descifrado = mide(lambda: cifrado.descifra(criptograma))
+    print(f'Hill {n}x{n}, 10 MB: cifrado {t_cifrado:.3f} s, descifrado {t_descifrado:.3f} s')
+
+# ------------------------------------------------------------------------------
+# --                          CIFRADO DE PLAYFAIR                             --
+# ------------------------------------------------------------------------------
+
+def descifrado_playfair_por_digrama(cuadro, texto):
+    '''Implementación original del descifrado de Playfair, buscando cada
+    letra en el cuadro. Se conserva como referencia para las mediciones.'''
+
+    descifrado = ''
+    for d in hill.separa_grafias(texto.lower(), 2):
+        x1, y1 = playfair.busca_letra(cuadro, d[0])
+        x2, y2 = playfair.busca_letra(cuadro, d[1])
+        if x1 == x2:
+            descifrado += cuadro[x1][(y1 - 1) % 5] + cuadro[x1][(y2 - 1) % 5]
+        elif y1 == y2:
+            descifrado += cuadro[(x1 - 1) % 5][y1] + cuadro[(x2 - 1) % 5][y1]
+        else:
+            descifrado += cuadro[x1][y2] + cuadro[x2][y1]
+    return descifrado
+
+cuadro = playfair.construye_cuadro('dinamitabb')
+t_original = mide(lambda: descifrado_playfair_por_digrama(cuadro, playfair.cripto4), 100)
+t_nuevo = mide(lambda: playfair.descifrado_playfair(cuadro, playfair.cripto4), 100)
+reporta('Descifrado de Playfair (cripto4)', t_original, t_nuevo)
+
+puntaje, cuadro_encontrado, descifrado, velocidad = playfair.rompe_playfair(playfair.cripto4, semilla=1)
+print(f'Recocido simulado sobre cripto4: {velocidad:.0f} iteraciones/s')
+print('Texto descifrado:', descifrado[:80], '...')
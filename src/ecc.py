@@ -1,3 +1,28 @@
+import importlib.util
+import math
+import os
+import random
+import sys
+from array import array
+from functools import lru_cache
+from itertools import chain, repeat
+
+# La aritmética modular se comparte con los cifrados clásicos, que la importan
+# por nombre (aritmetica_modular) desde su directorio. Se carga desde su
+# archivo y se registra con ese mismo nombre, sin modificar sys.path, para que
+# ambos usen el mismo módulo (y la misma tabla de inversos).
+if 'aritmetica_modular' not in sys.modules:
+    _spec = importlib.util.spec_from_file_location(
+        'aritmetica_modular',
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'clasicos', 'aritmetica_modular.py'))
+    _modulo = importlib.util.module_from_spec(_spec)
+    sys.modules['aritmetica_modular'] = _modulo
+    _spec.loader.exec_module(_modulo)
+    del _spec, _modulo
+
+from aritmetica_modular import (es_primo_probable, inverso_mod, raiz_cuadrada_mod,
+                                reduce_mod, simbolo_legendre, teorema_chino)
+
 class CurvaElipticaModular:
     '''Representa una curva elíptica definida sobre un número primo. Contiene
     además operaciones usadas en la criptografía de curva elíptica modular.'''
@@ -5,14 +30,18 @@ class CurvaElipticaModular:
     p = None
     a = None
     b = None
-    puntos = []
 
-    def __init__(self, primo_p, const_a, const_b):
-        '''Inicializa una curva elíptica con los valores especificados.
+    def __init__(self, primo_p, const_a, const_b, enumerar=False):
+        '''Inicializa una curva elíptica con los valores especificados. Los
+        puntos de la curva no se calculan al crearla, sino la primera vez que
+        se consultan (ver puntos), de modo que crear una curva sobre un primo
+        grande es inmediato.
 
         :param const_a: el valor de la constante A en la definición de la curva.
         :param const_b: el valor de la constante B en la definición de la curva.
         :param primo_p: el valor del primo sobre el que se define la curva.
+        :param enumerar: si es True, los puntos de la curva se calculan desde
+               la creación.
         :raises ValueError: si el número PRIMO_P no es primo, o si el
                 determinante de la curva es cero.'''
 
@@ -25,15 +54,75 @@ class CurvaElipticaModular:
         self.p = primo_p
         self.a = const_a
         self.b = const_b
-        self.puntos = CurvaElipticaModular.soluciones_curva(const_a, const_b, primo_p)
+        self._puntos = None
+        self._conjunto_puntos = None
+        self._tablas_naf = {}
+        if enumerar:
+            self.puntos
+
+    @property
+    def puntos(self):
+        '''La lista de puntos de la curva (sin el punto al infinito). Se
+        calcula con soluciones_curva la primera vez que se consulta.'''
+
+        if self._puntos is None:
+            self._puntos = CurvaElipticaModular.soluciones_curva(self.a, self.b, self.p)
+        return self._puntos
+
+    @property
+    def conjunto_puntos(self):
+        '''El conjunto de puntos de la curva (sin el punto al infinito), para
+        consultar en tiempo constante si un punto está en la lista de puntos.
+        Se calcula junto con la lista la primera vez que se consulta.'''
+
+        if self._conjunto_puntos is None:
+            self._conjunto_puntos = frozenset(self.puntos)
+        return self._conjunto_puntos
+
+    def __contains__(self, punto):
+        '''Permite escribir `punto in curva` (ver contiene).'''
+
+        return self.contiene(punto)
+
+    def lado_derecho(self, x):
+        '''Evalúa el lado derecho de la ecuación de la curva, x^3 + Ax + B,
+        módulo P.
+
+        :param x: la coordenada x.
+        :returns: el valor de x^3 + Ax + B módulo P.'''
+
+        return (x * x * x + self.a * x + self.b) % self.p
+
+    def puntos_con_x(self, x):
+        '''Obtiene los puntos de la curva con la coordenada x especificada,
+        sin enumerar la curva: el criterio de Euler indica si x^3 + Ax + B
+        tiene raíz cuadrada módulo P, y Tonelli-Shanks la encuentra.
+
+        :param x: la coordenada x, entre 0 y P - 1.
+        :returns: una lista con los puntos (cero, uno o dos) de la curva con
+                  esa coordenada x, de menor a mayor coordenada y.'''
+
+        valor = self.lado_derecho(x)
+        if simbolo_legendre(valor, self.p) == -1:
+            return []
+        y = raiz_cuadrada_mod(valor, self.p)
+        if y == 0 or 2 * y == self.p:
+            return [Punto(x, y)]
+        return [Punto(x, y), Punto(x, self.p - y)]
+
+    def contiene(self, punto):
+        '''Determina si el punto especificado es parte de la curva elíptica,
+        en tiempo constante: basta verificar la ecuación de la curva, sin
+        enumerar sus puntos. El punto al infinito es parte de toda curva.
 
-    def es_punto(self, punto):
-        '''Determina si el punto especificado es parte de la curva elíptica.
-        
         :param punto: el punto que se desea verificar si es parte de la curva.
         :returns: True si el punto es parte de la curva, False en otro caso.'''
 
-        return es_punto(punto, self.a, self.b, self.p)
+        if punto.es_infinito():
+            return True
+        return (isinstance(punto.x, int) and isinstance(punto.y, int)
+                and 0 <= punto.x < self.p and 0 <= punto.y < self.p
+                and punto.y * punto.y % self.p == self.lado_derecho(punto.x))
 
     def suma_puntos(self, punto1, punto2):
         '''Calcula la suma de los puntos especificados, que estan sobre esta
@@ -44,103 +133,637 @@ class CurvaElipticaModular:
         :returns: el punto sobre la curva, resultante de sumar punto1 y
                   punto2.'''
 
-        if punto1 not in self.puntos or punto2 not in self.puntos:
+        if not self.contiene(punto1) or not self.contiene(punto2):
             raise ValueError('Los puntos especificados no forman parte de la curva.')
+        return self.suma(punto1, punto2)
+
+    def suma(self, punto1, punto2):
+        '''Suma dos puntos de la curva sin verificar que estén en ella. Es la
+        operación que usan internamente exp_puntos y los demás algoritmos,
+        una vez que sus entradas ya fueron verificadas.
 
-        if punto1.x == punto2.x and punto1.y != punto2.y:
-            return Punto(float('inf'), float('inf'))    # Punto al infinito
-        elif punto1.x == punto2.x and punto1.y == punto2.y and punto1.y == 0:
-            return Punto(float('inf'), float('inf'))
+        :param punto1: el primer punto a sumar.
+        :param punto2: el segundo punto a sumar.
+        :returns: el punto resultante de sumar punto1 y punto2.'''
+
+        if punto1.es_infinito():
+            return punto2
+        if punto2.es_infinito():
+            return punto1
+
+        p = self.p
+        if punto1.x == punto2.x:
+            if (punto1.y + punto2.y) % p == 0:
+                return Punto.infinito    # Punto al infinito
+            val_lambda = ((3 * (punto1.x ** 2)) + self.a) * inverso(2 * punto1.y % p, p)
         else:
-            val_lambda = 0
-            if punto1.x == punto2.x and punto1.y == punto2.y:
-                val_lambda = ((3 * (punto1.x ** 2)) + self.a) * inverso(2 * punto1.y, self.p)
-            else:
-                val_lambda = (punto2.y - punto1.y) * inverso(punto2.x - punto1.x, self.p)
-            x3 = cong_mod_M((val_lambda ** 2) - punto1.x - punto2.x, self.p)
-            y3 = cong_mod_M((val_lambda * (punto1.x - x3)) - punto1.y, self.p)
-            return Punto(x3, y3)
+            val_lambda = (punto2.y - punto1.y) * inverso((punto2.x - punto1.x) % p, p)
+        x3 = ((val_lambda ** 2) - punto1.x - punto2.x) % p
+        y3 = ((val_lambda * (punto1.x - x3)) - punto1.y) % p
+        return Punto(x3, y3)
 
-    def exp_puntos(self, punto, n):
+    def negativo(self, punto):
+        '''Obtiene el inverso aditivo del punto especificado: (x, -y).
+
+        :param punto: un punto de la curva.
+        :returns: el punto que sumado con PUNTO da el punto al infinito.'''
+
+        if punto.es_infinito():
+            return punto
+        return Punto(punto.x, -punto.y % self.p)
+
+    def exp_puntos(self, punto, n, ventana=None):
         '''Realiza el producto/exponenciación del punto especificado, es decir,
         la suma del punto iterada sobre sí mismo N veces, en esta curva
-        eliptica.
+        eliptica. Se usa el método de duplicar y sumar, con O(log N) sumas de
+        puntos: se recorren los bits de N, duplicando el resultado en cada
+        bit y sumando el punto en los bits encendidos. Los resultados
+        intermedios se guardan en coordenadas jacobianas (ver PuntoJacobiano).
+
+        Con una ventana W, N se escribe en forma NAF de ancho W (ver
+        forma_naf) y se suman los múltiplos impares del punto, precalculados
+        una sola vez por punto base (ver tabla_naf): en promedio sólo uno de
+        cada W + 1 dígitos no es cero.
 
         :param punto: el punto que se desea operar.
-        :param n: la cantidad de veces que se hará la iteración.
+        :param n: la cantidad de veces que se hará la iteración; si es cero el
+               resultado es el punto al infinito, y si es negativa se opera el
+               inverso del punto.
+        :param ventana: el ancho W de la forma NAF (2 o más), o None para
+               duplicar y sumar bit por bit.
         :returns: el punto resultante de hacer la operación.'''
 
-        if punto not in self.puntos:
+        if not self.contiene(punto):
             raise ValueError('El punto especificado no forma parte de la curva.')
 
-        parcial = Punto(punto.x, punto.y)
-        for i in range(1, n):
-            parcial = self.suma_puntos(parcial, punto)
-        return parcial
+        if n < 0:
+            punto, n = self.negativo(punto), -n
+        resultado = Punto.infinito
+        if n == 0 or punto.es_infinito():
+            return resultado
 
-    def logaritmo(self, punto1, punto2):
-        '''Calcula el logaritmo discreto para los puntos especificados usando
-        fuerza bruta, es decir, el valor K tal que punto1 = K * punto2, en esta
-        curva eliptica.
+        # Las sumas intermedias se hacen en coordenadas jacobianas, sin
+        # inversos; sólo se invierte una vez, al convertir el resultado.
+        if ventana is None:
+            return PuntoJacobiano.desde_punto(punto).multiplica(n, self.a, self.p).a_punto(self.p)
+
+        tabla = [PuntoJacobiano.desde_punto(q) for q in self.tabla_naf(punto, ventana)]
+        acumulado = PuntoJacobiano.desde_punto(resultado)
+        for digito in reversed(forma_naf(n, ventana)):
+            acumulado = acumulado.duplica(self.a, self.p)
+            if digito > 0:
+                acumulado = acumulado.suma(tabla[digito // 2], self.a, self.p)
+            elif digito < 0:
+                acumulado = acumulado.suma(tabla[-digito // 2].negativo(self.p), self.a, self.p)
+        return acumulado.a_punto(self.p)
+
+    def tabla_naf(self, punto, ventana):
+        '''Obtiene los múltiplos impares P, 3P, 5P, ..., (2^(W-1) - 1)P del
+        punto especificado, que usa exp_puntos con la forma NAF de ancho W.
+        Las tablas se guardan en la curva, de modo que multiplicar varias
+        veces el mismo punto base sólo las calcula la primera vez; se guardan
+        a lo más 64, y al llenarse se descarta la más antigua.
+
+        :param punto: el punto base, sobre la curva.
+        :param ventana: el ancho W de la forma NAF.
+        :returns: una lista cuyo elemento i es (2i + 1)P.'''
+
+        llave = (punto, ventana)
+        tablas = self._tablas_naf
+        if llave not in tablas:
+            if len(tablas) >= 64:
+                # Los diccionarios conservan el orden de inserción.
+                del tablas[next(iter(tablas))]
+            doble = self.suma(punto, punto)
+            tabla = [punto]
+            for _ in range(1, 1 << (ventana - 2)):
+                tabla.append(self.suma(tabla[-1], doble))
+            tablas[llave] = tabla
+        return tablas[llave]
+
+    def exp_base_fija(self, punto, n, ancho=4):
+        '''Calcula N * punto con una tabla de base fija (ver tabla_base_fija):
+        N se escribe en base 2^W y por cada dígito no nulo se suma una
+        entrada de la tabla, sin duplicar. Conviene cuando se multiplica
+        muchas veces el mismo punto base (por ejemplo, el generador de la
+        curva): la tabla se calcula una sola vez.
+
+        :param punto: el punto base, sobre la curva.
+        :param n: un entero; si es negativo se opera el inverso del punto.
+        :param ancho: el ancho W, en bits, de cada dígito de N.
+        :returns: el punto N * punto.'''
+
+        if not self.contiene(punto):
+            raise ValueError('El punto especificado no forma parte de la curva.')
+
+        if n < 0:
+            return self.negativo(self.exp_base_fija(punto, -n, ancho))
+        if n == 0 or punto.es_infinito():
+            return Punto.infinito
+        if n.bit_length() > self.p.bit_length() + 1:
+            # La tabla sólo cubre escalares del tamaño de P.
+            return self.exp_puntos(punto, n)
+
+        tabla = CurvaElipticaModular.tabla_base_fija(self.a, self.p, punto, ancho)
+        mascara = (1 << ancho) - 1
+        acumulado = PuntoJacobiano(1, 1, 0)
+        for renglon in tabla:
+            if n == 0:
+                break
+            if n & mascara:
+                acumulado = acumulado.suma(renglon[n & mascara], self.a, self.p)
+            n >>= ancho
+        return acumulado.a_punto(self.p)
+
+    @staticmethod
+    @lru_cache(maxsize=16)
+    def tabla_base_fija(a, p, punto, ancho):
+        '''Construye la tabla de base fija del punto: el renglón i tiene los
+        múltiplos d * 2^(W i) * punto, para 0 <= d < 2^W, en coordenadas
+        jacobianas, y hay renglones suficientes para escalares de hasta
+        log2(P) + 1 bits. Las tablas se guardan por curva (A, P) y punto; las
+        menos usadas recientemente se descartan.
+
+        :param a: la constante A de la curva.
+        :param p: el primo sobre el que se define la curva.
+        :param punto: el punto base, sobre la curva.
+        :param ancho: el ancho W, en bits, de cada dígito.
+        :returns: una lista de renglones; cada renglón es una lista de 2^W
+                  puntos jacobianos.'''
+
+        tabla = []
+        base = PuntoJacobiano.desde_punto(punto)
+        for _ in range(-(-(p.bit_length() + 1) // ancho)):
+            renglon = [PuntoJacobiano(1, 1, 0), base]
+            for _ in range(2, 1 << ancho):
+                renglon.append(renglon[-1].suma(base, a, p))
+            tabla.append(renglon)
+            base = renglon[-1].suma(base, a, p)    # 2^W * base
+        return tabla
+
+    def exp_multiple(self, escalares, puntos, ventana=4):
+        '''Calcula la suma k_1 * P_1 + k_2 * P_2 + ... con el método de Straus
+        (el truco de Shamir, para dos puntos): en lugar de multiplicar cada
+        punto por separado, los escalares se recorren juntos, W bits a la
+        vez, de modo que las duplicaciones se comparten y sólo se suma una
+        entrada de la tabla de cada punto por dígito. Es el cálculo de
+        u1 * G + u2 * Q al verificar una firma ECDSA.
+
+        :param escalares: la lista de enteros k_i.
+        :param puntos: la lista de puntos P_i, sobre la curva.
+        :param ventana: el ancho W, en bits, de los dígitos de cada escalar.
+        :returns: el punto resultante de la suma.'''
+
+        a, p = self.a, self.p
+        tablas = []
+        digitos = []
+        for k, punto in zip(escalares, puntos):
+            if not self.contiene(punto):
+                raise ValueError('Los puntos especificados no forman parte de la curva.')
+            if k < 0:
+                k, punto = -k, self.negativo(punto)
+            if k == 0 or punto.es_infinito():
+                continue
+            base = PuntoJacobiano.desde_punto(punto)
+            tabla = [PuntoJacobiano(1, 1, 0), base]
+            for _ in range(2, 1 << ventana):
+                tabla.append(tabla[-1].suma(base, a, p))
+            tablas.append(tabla)
+            digitos.append(k)
+
+        if not tablas:
+            return Punto.infinito
+        mascara = (1 << ventana) - 1
+        pasos = -(-max(k.bit_length() for k in digitos) // ventana)
+        acumulado = PuntoJacobiano(1, 1, 0)
+        for i in range(pasos - 1, -1, -1):
+            for _ in range(ventana):
+                acumulado = acumulado.duplica(a, p)
+            for tabla, k in zip(tablas, digitos):
+                digito = (k >> (i * ventana)) & mascara
+                if digito:
+                    acumulado = acumulado.suma(tabla[digito], a, p)
+        return acumulado.a_punto(p)
+
+    def logaritmo(self, punto1, punto2, metodo='bsgs'):
+        '''Calcula el logaritmo discreto para los puntos especificados, es
+        decir, el valor K tal que punto1 = K * punto2, en esta curva eliptica.
 
         :param punto1: el punto que se desea igualar.
         :param punto2: la base del logaritmo que se desea encontrar.
-        :returns: el valor numérico del logaritmo discreto.'''
+        :param metodo: el algoritmo a usar: 'fuerza_bruta' (prueba K = 0, 1,
+               2, ...), 'bsgs' (paso de bebé, paso de gigante; ver
+               logaritmo_bsgs), 'rho' (rho de Pollard; ver logaritmo_rho) o
+               'pohlig_hellman' (ver logaritmo_pohlig_hellman).
+        :returns: el valor numérico del logaritmo discreto, el menor K no
+                  negativo.
+        :raises ValueError: si los puntos no están en la curva, si punto1 no
+                es múltiplo de punto2 o si el método no existe.'''
 
-        if punto1 not in self.puntos or punto2 not in self.puntos:
+        if not self.contiene(punto1) or not self.contiene(punto2):
             raise ValueError('Los puntos especificados no forman parte de la curva.')
 
-        i = 1
-        while(True):
-            prueba = self.exp_puntos(punto2, i)
+        if metodo == 'fuerza_bruta':
+            return self.logaritmo_fuerza_bruta(punto1, punto2)
+        elif metodo == 'bsgs':
+            return self.logaritmo_bsgs(punto1, punto2)
+        elif metodo == 'rho':
+            return self.logaritmo_rho(punto1, punto2)
+        elif metodo == 'pohlig_hellman':
+            return self.logaritmo_pohlig_hellman(punto1, punto2)
+        raise ValueError('Método desconocido: ' + str(metodo))
+
+    def logaritmo_fuerza_bruta(self, punto1, punto2):
+        '''Calcula el logaritmo discreto probando K = 0, 1, 2, ..., con una
+        suma de puntos por cada K.
+
+        :param punto1: el punto que se desea igualar.
+        :param punto2: la base del logaritmo.
+        :returns: el menor K no negativo tal que punto1 = K * punto2.
+        :raises ValueError: si punto1 no es múltiplo de punto2.'''
+
+        prueba = Punto.infinito
+        k = 0
+        while True:
             if prueba == punto1:
-                return i
-            i += 1
+                return k
+            prueba = self.suma(prueba, punto2)
+            k += 1
+            if prueba.es_infinito():
+                raise ValueError('El punto no es múltiplo de la base del logaritmo.')
+
+    def logaritmo_bsgs(self, punto1, punto2, cota=None):
+        '''Calcula el logaritmo discreto con el algoritmo de paso de bebé,
+        paso de gigante, en O(sqrt(N)) sumas de puntos y memoria. Con M =
+        ceil(sqrt(N)), los pasos de bebé j * punto2 (0 <= j < M) se guardan en
+        un diccionario, y se buscan en él los pasos de gigante
+        punto1 - i * M * punto2; si hay coincidencia, K = i * M + j.
+
+        :param punto1: el punto que se desea igualar.
+        :param punto2: la base del logaritmo.
+        :param cota: una cota N para el orden de punto2. Por omisión se usa la
+               cota de Hasse para el número de puntos de la curva,
+               P + 1 + 2 * sqrt(P).
+        :returns: el menor K no negativo tal que punto1 = K * punto2.
+        :raises ValueError: si punto1 no es múltiplo de punto2.'''
+
+        if cota is None:
+            cota = self.p + 1 + 2 * math.isqrt(self.p) + 2
+        m = math.isqrt(cota - 1) + 1
+
+        # Sólo se guarda el menor j de cada punto, para que K sea el menor.
+        pasos_bebe = {}
+        paso = Punto.infinito
+        for j in range(m):
+            pasos_bebe.setdefault(paso, j)
+            paso = self.suma(paso, punto2)
+
+        gigante = self.negativo(self.exp_puntos(punto2, m))
+        buscado = punto1
+        for i in range(m):
+            j = pasos_bebe.get(buscado)
+            if j is not None:
+                return i * m + j
+            buscado = self.suma(buscado, gigante)
+        raise ValueError('El punto no es múltiplo de la base del logaritmo.')
+
+    def logaritmo_rho(self, punto1, punto2, orden=None, semilla=None):
+        '''Calcula el logaritmo discreto con el algoritmo rho de Pollard, en
+        O(sqrt(N)) sumas de puntos esperadas y memoria constante. Se sigue una
+        caminata pseudoaleatoria R = a * punto2 + b * punto1 (el paso depende
+        de la coordenada x de R) hasta que el algoritmo de Floyd encuentra un
+        ciclo: de a * punto2 + b * punto1 = a' * punto2 + b' * punto1 se
+        obtiene K * (b' - b) = a - a' (mod N). La partición que decide el
+        paso cambia en cada intento; si ningún intento encuentra K (lo que
+        pasa en subgrupos muy pequeños, donde la caminata puede no cambiar
+        b), se resuelve con logaritmo_bsgs.
+
+        :param punto1: el punto que se desea igualar.
+        :param punto2: la base del logaritmo.
+        :param orden: el orden N de punto2; por omisión se calcula con orden.
+        :param semilla: la semilla de los puntos de partida de la caminata.
+        :returns: el menor K no negativo tal que punto1 = K * punto2.
+        :raises ValueError: si punto1 no es múltiplo de punto2.'''
+
+        n = self.orden(punto2) if orden is None else orden
+        if punto1.es_infinito():
+            return 0
+        rnd = random.Random(semilla)
+
+        def paso(r, a, b):
+            particion = 0 if r.es_infinito() else (r.x * sal_x + r.y * sal_y + sal) % 3
+            if particion == 0:
+                return self.suma(r, punto2), (a + 1) % n, b
+            elif particion == 1:
+                return self.suma(r, r), 2 * a % n, 2 * b % n
+            return self.suma(r, punto1), a, (b + 1) % n
+
+        for _ in range(32):
+            sal_x, sal_y, sal = rnd.randrange(1, 3), rnd.randrange(3), rnd.randrange(3)
+            a, b = rnd.randrange(n), rnd.randrange(n)
+            tortuga = (self.suma(self.exp_puntos(punto2, a), self.exp_puntos(punto1, b)), a, b)
+            liebre = paso(*tortuga)
+            while tortuga[0] != liebre[0]:
+                tortuga = paso(*tortuga)
+                liebre = paso(*paso(*liebre))
+
+            # a1 * P + b1 * Q = a2 * P + b2 * Q, con Q = K * P.
+            _, a1, b1 = tortuga
+            _, a2, b2 = liebre
+            divisor = math.gcd((b2 - b1) % n, n)
+            if (b2 - b1) % n == 0 or (a1 - a2) % divisor != 0:
+                continue
+            modulo = n // divisor
+            k = ((a1 - a2) // divisor) * inverso((b2 - b1) // divisor % modulo, modulo) % modulo \
+                if modulo > 1 else 0
+            for _ in range(divisor):
+                if self.exp_puntos(punto2, k) == punto1:
+                    return k
+                k += modulo
+        return self.logaritmo_bsgs(punto1, punto2, cota=n)
+
+    def logaritmo_pohlig_hellman(self, punto1, punto2):
+        '''Calcula el logaritmo discreto con el algoritmo de Pohlig-Hellman:
+        para cada potencia de primo q^e que divide al orden N de punto2, se
+        obtiene K módulo q^e resolviendo e logaritmos en el subgrupo de orden
+        q (con logaritmo_bsgs), y los resultados se combinan con el teorema
+        chino del residuo. El costo depende del mayor factor primo de N, no de
+        N.
+
+        :param punto1: el punto que se desea igualar.
+        :param punto2: la base del logaritmo.
+        :returns: el menor K no negativo tal que punto1 = K * punto2.
+        :raises ValueError: si punto1 no es múltiplo de punto2.'''
+
+        n = self.orden(punto2)
+        residuos = []
+        modulos = []
+        for q, e in factoriza(n).items():
+            generador = self.exp_puntos(punto2, n // q)    # De orden q.
+            k = 0
+            for i in range(e):
+                resto = self.suma(punto1, self.negativo(self.exp_puntos(punto2, k)))
+                digito = self.logaritmo_bsgs(self.exp_puntos(resto, n // q ** (i + 1)),
+                                             generador, cota=q)
+                k += digito * q ** i
+            residuos.append(k)
+            modulos.append(q ** e)
+
+        k = teorema_chino(residuos, modulos)
+        if self.exp_puntos(punto2, k) != punto1:
+            raise ValueError('El punto no es múltiplo de la base del logaritmo.')
+        return k
+
+    def cardinalidad(self):
+        '''Obtiene la cantidad de puntos de la curva, incluyendo el punto al
+        infinito, es decir, el orden del grupo de la curva. Si los puntos ya
+        se enumeraron se cuentan; si no, se calcula sin enumerarlos con
+        numero_puntos, que guarda el resultado de cada curva (P, A, B).
+
+        :returns: la cantidad de puntos de la curva.'''
+
+        if self._puntos is not None:
+            return len(self._puntos) + 1
+        return CurvaElipticaModular.numero_puntos(self.a % self.p, self.b % self.p, self.p)
+
+    def anuladores(self, punto, inferior, superior):
+        '''Obtiene los enteros M del intervalo [inferior, superior] tales que
+        M * punto es el punto al infinito, con paso de bebé, paso de gigante:
+        O(sqrt(superior - inferior)) sumas de puntos. Dos anuladores
+        consecutivos difieren exactamente en el orden del punto.
+
+        :param punto: un punto de la curva.
+        :param inferior: el extremo inferior del intervalo, positivo.
+        :param superior: el extremo superior del intervalo.
+        :returns: la lista de anuladores, de menor a mayor.'''
+
+        m = math.isqrt(superior - inferior) + 1
+        pasos_bebe = {}
+        paso = Punto.infinito
+        for j in range(m):
+            if j > 0 and paso.es_infinito():
+                # El orden del punto es j: los anuladores son sus múltiplos.
+                return list(range(-(-inferior // j) * j, superior + 1, j))
+            pasos_bebe[paso] = j
+            paso = self.suma(paso, punto)
+
+        # Los pasos de bebé son distintos, así que cada paso de gigante
+        # (inferior + i * M) * punto coincide a lo más con uno de ellos.
+        resultado = []
+        gigante = self.exp_puntos(punto, inferior)
+        for i in range((superior - inferior) // m + 2):
+            j = pasos_bebe.get(gigante)
+            if j is not None and inferior <= inferior + i * m - j <= superior:
+                resultado.append(inferior + i * m - j)
+            gigante = self.suma(gigante, paso)
+        return sorted(resultado)
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def numero_puntos(a, b, p):
+        '''Calcula la cantidad de puntos de la curva y^2 = x^3 + Ax + B sobre
+        P, incluyendo el punto al infinito, sin enumerar los puntos. Para P
+        menor que limite_conteo_tabla (o una curva singular) se cuentan las
+        raíces cuadradas con numero_puntos_tabla, en O(P); para P mayor se usa
+        el método de Mestre (ver numero_puntos_mestre), en O(P^(1/4)) sumas de
+        puntos. El resultado de cada curva se guarda.
+
+        :param a: el valor de la constante A, entre 0 y P - 1.
+        :param b: el valor de la constante B, entre 0 y P - 1.
+        :param p: el primo sobre el que se define la curva.
+        :returns: la cantidad de puntos de la curva.'''
+
+        if p < limite_conteo_tabla or CurvaElipticaModular.curva_discriminante(a, b, p) == 0:
+            return CurvaElipticaModular.numero_puntos_tabla(a, b, p)
+        return CurvaElipticaModular.numero_puntos_mestre(a, b, p)
+
+    @staticmethod
+    def numero_puntos_tabla(a, b, p):
+        '''Cuenta los puntos de la curva y^2 = x^3 + Ax + B sobre P con una
+        tabla de la cantidad de raíces cuadradas de cada residuo: para cada x
+        hay tantos puntos como raíces tenga x^3 + Ax + B. Equivale a sumar
+        los símbolos de Legendre, P + 1 + sum((x^3 + Ax + B / P)), sin
+        calcular una potencia por cada x.
+
+        :param a: el valor de la constante A.
+        :param b: el valor de la constante B.
+        :param p: el primo sobre el que se define la curva.
+        :returns: la cantidad de puntos de la curva, con el punto al infinito.'''
+
+        raices = bytearray(p)
+        for y in range(p):
+            raices[y * y % p] += 1
+        return 1 + sum(raices[(x * x * x + a * x + b) % p] for x in range(p))
+
+    @staticmethod
+    def numero_puntos_mestre(a, b, p, semilla=None):
+        '''Calcula la cantidad N de puntos de la curva y^2 = x^3 + Ax + B
+        sobre P con el método de Mestre. Por la cota de Hasse, N está en el
+        intervalo [P + 1 - 2 sqrt(P), P + 1 + 2 sqrt(P)], y es múltiplo del
+        orden de cualquier punto de la curva; la torcedura cuadrática de la
+        curva tiene 2P + 2 - N puntos. Se toman puntos al azar de la curva y
+        de la torcedura, y se buscan sus anuladores en el intervalo (ver
+        anuladores) hasta que sólo un valor de N es compatible con todos. Para
+        P > 229 siempre termina (teorema de Mestre).
+
+        :param a: el valor de la constante A.
+        :param b: el valor de la constante B.
+        :param p: el primo sobre el que se define la curva, mayor que 229.
+        :param semilla: la semilla de los puntos al azar.
+        :returns: la cantidad de puntos de la curva, con el punto al infinito.'''
+
+        inferior, superior = p + 1 - math.isqrt(4 * p), p + 1 + math.isqrt(4 * p)
+        d = 2
+        while simbolo_legendre(d, p) != -1:
+            d += 1
+        curva = CurvaElipticaModular(p, a, b)
+        torcedura = CurvaElipticaModular(p, a * d * d % p, b * d * d * d % p)
+        rnd = random.Random(p if semilla is None else semilla)
+
+        # N es múltiplo de orden_curva y 2P + 2 - N de orden_torcedura.
+        orden_curva, orden_torcedura = 1, 1
+        for intento in range(256):
+            actual = curva if intento % 2 == 0 else torcedura
+            puntos = actual.puntos_con_x(rnd.randrange(p))
+            if not puntos:
+                continue
+            candidatos = actual.anuladores(puntos[0], inferior, superior)
+            if len(candidatos) == 1:
+                return candidatos[0] if actual is curva else 2 * p + 2 - candidatos[0]
+            orden = candidatos[1] - candidatos[0]
+            if actual is curva:
+                orden_curva = orden_curva * orden // math.gcd(orden_curva, orden)
+            else:
+                orden_torcedura = orden_torcedura * orden // math.gcd(orden_torcedura, orden)
+
+            # Se revisan los valores de N compatibles cuando son pocos.
+            if (superior - inferior) // max(orden_curva, orden_torcedura) > 4096:
+                continue
+            if orden_curva >= orden_torcedura:
+                posibles = range(-(-inferior // orden_curva) * orden_curva, superior + 1,
+                                 orden_curva)
+                posibles = [n for n in posibles if (2 * p + 2 - n) % orden_torcedura == 0]
+            else:
+                posibles = range(-(-inferior // orden_torcedura) * orden_torcedura,
+                                 superior + 1, orden_torcedura)
+                posibles = [2 * p + 2 - n for n in posibles if (2 * p + 2 - n) % orden_curva == 0]
+            if len(posibles) == 1:
+                return posibles[0]
+        return CurvaElipticaModular.numero_puntos_tabla(a, b, p)
 
     def orden(self, punto):
-        '''Obtiene el orden del punto especificado, en esta curva elíptica.
+        '''Obtiene el orden del punto especificado, en esta curva elíptica. El
+        orden divide al orden N del grupo (ver cardinalidad): para cada primo
+        q que divide a N, se quita el factor q mientras el punto multiplicado
+        por el resto siga siendo el punto al infinito, como en el algoritmo de
+        Pohlig-Hellman. Se necesitan O(log N) multiplicaciones por escalar.
 
         :param punto: el punto al que se desea obtener su orden
         :returns: el entero que representa el orden del punto.'''
 
-        i = 1
-        while True:
-            prueba = self.exp_puntos(punto, i)
-            if prueba.es_infinito():
-                return i
-            i += 1
+        if not self.contiene(punto):
+            raise ValueError('El punto especificado no forma parte de la curva.')
+
+        n = self.cardinalidad()
+        for q, e in factoriza(n).items():
+            n //= q ** e
+            multiplo = self.exp_puntos(punto, n)
+            while not multiplo.es_infinito():
+                multiplo = self.exp_puntos(multiplo, q)
+                n *= q
+        return n
 
     @staticmethod
-    def curvas_validas(p):
+    def curvas_validas(p, generador=False):
         '''Obtiene un listado de las posibles combinaciones de valores A y B que
-        definen curvas validas para el valor primo P especificado.
+        definen curvas validas para el valor primo P especificado. Se
+        clasifican todos los pares con discriminantes_nulos, en O(P), y sólo
+        se recorren los pares para devolverlos.
 
         :param p: el numero primo sobre el cual se define la curva.
-        :returns: la lista de pares (A, B) que definen curvas elipticas sobre P
-        (el discriminante no es 0).'''
+        :param generador: si es True, se devuelve un generador de los pares en
+               lugar de la lista; así la memoria no crece con P^2.
+        :returns: la lista (o el generador) de pares (A, B) que definen curvas
+                  elipticas sobre P (el discriminante no es 0), ordenados por
+                  A y luego por B.'''
 
-        pares = []
-        for i in range(0, p):
-            for j in range(0, p):
-                if CurvaElipticaModular.curva_discriminante(i, j, p) != 0:
-                    pares.append((i, j))
-        return pares
+        # Cada renglón A se parte en los tramos de B entre sus discriminantes
+        # nulos, y cada tramo se arma con zip, sin un ciclo de Python por par.
+        tramos = []
+        for i, nulos in enumerate(CurvaElipticaModular.discriminantes_nulos(p)):
+            inicio = 0
+            for j in nulos + (p,):
+                if inicio < j:
+                    tramos.append(zip(repeat(i), range(inicio, j)))
+                inicio = j + 1
+        pares = chain.from_iterable(tramos)
+        return pares if generador else list(pares)
 
     @staticmethod
-    def curvas_invalidas(p):
+    def curvas_invalidas(p, generador=False):
         '''Obtiene un listado de las posibles combinaciones de valores A y B que
-        no producen curvas válidas para el valor primo P especificado.
+        no producen curvas válidas para el valor primo P especificado. Hay
+        O(P) pares así, y se obtienen en O(P) con discriminantes_nulos.
+
+        :param p: el numero primo sobre el cual se define la curva.
+        :param generador: si es True, se devuelve un generador de los pares en
+               lugar de la lista.
+        :returns: la lista (o el generador) de pares (A, B) cuyo
+                  discriminante es 0, ordenados por A y luego por B.'''
+
+        nulos = CurvaElipticaModular.discriminantes_nulos(p)
+        pares = ((i, j) for i in range(p) for j in nulos[i])
+        return pares if generador else list(pares)
+
+    @staticmethod
+    def conteo_curvas(p):
+        '''Cuenta los pares (A, B) que definen curvas válidas e inválidas sobre
+        P, sin construir los pares, en O(P).
 
         :param p: el numero primo sobre el cual se define la curva.
-        :returns: la lista de pares (A, B) que definen curvas elipticas sobre P
-        (el discriminante no es 0).'''
+        :returns: una tupla (validas, invalidas) con la cantidad de pares de
+                  cada tipo; su suma es P^2.'''
 
-        pares = []
-        for i in range(0, p):
-            for j in range(0, p):
-                if CurvaElipticaModular.curva_discriminante(i, j, p) == 0:
-                    pares.append((i, j))
-        return pares
+        invalidas = sum(map(len, CurvaElipticaModular.discriminantes_nulos(p)))
+        return p * p - invalidas, invalidas
+
+    @staticmethod
+    def mascara_curvas(p):
+        '''Obtiene la máscara de las curvas válidas sobre P, renglón por
+        renglón: para cada A, un bytearray de longitud P cuya entrada B es 1
+        si el par (A, B) define una curva válida y 0 si no. Sólo se guarda un
+        renglón a la vez.
+
+        :param p: el numero primo sobre el cual se define la curva.
+        :returns: un generador de tuplas (A, renglon).'''
+
+        unos = b'\x01' * p
+        for i, nulos in enumerate(CurvaElipticaModular.discriminantes_nulos(p)):
+            renglon = bytearray(unos)
+            for j in nulos:
+                renglon[j] = 0
+            yield i, renglon
+
+    @staticmethod
+    def discriminantes_nulos(p):
+        '''Clasifica todos los pares (A, B) sobre P de una sola vez. El
+        discriminante 4A^3 + 27B^2 es cero exactamente cuando 4A^3 = -27B^2
+        (mod P), así que basta calcular los residuos 4A^3 de cada A y -27B^2
+        de cada B (dos arreglos de longitud P) y agrupar los B por residuo: a
+        cada A le corresponden los B de su residuo, que son a lo más dos (o
+        todos, si P es 2 o 3).
+
+        :param p: el numero primo sobre el cual se define la curva.
+        :returns: una lista de longitud P cuya entrada A es la tupla de los B,
+                  de menor a mayor, para los que el discriminante es 0.'''
+
+        residuos_a = array('q', [4 * i * i * i % p for i in range(p)])
+        residuos_b = array('q', [-27 * j * j % p for j in range(p)])
+        por_residuo = {}
+        for j, r in enumerate(residuos_b):
+            por_residuo.setdefault(r, []).append(j)
+        por_residuo = {r: tuple(bs) for r, bs in por_residuo.items()}
+        return [por_residuo.get(r, ()) for r in residuos_a]
 
     @staticmethod
     def curva_discriminante(a, b, p):
@@ -163,14 +786,25 @@ class CurvaElipticaModular:
         :param b: la constante B de la curva eliptica.
         :param p: el primo sobre el cual se define la curva.
         :returns: la lista de puntos que son soluciones a la curva
-        especificada.'''
+        especificada, ordenados por coordenada x y luego por coordenada y.'''
+
+        # Tabla de raíces cuadradas: raices[r] es la menor y tal que y^2 = r
+        # (mod p), o -1 si r no es residuo cuadrático. Así cada x se resuelve
+        # con una sola evaluación del lado derecho, en lugar de probar las P
+        # posibles coordenadas y.
+        raices = array('l', [-1]) * p
+        raices[0] = 0
+        for y in range(p // 2, 0, -1):
+            raices[y * y % p] = y
 
         puntos = []
-        for i in range(0, p):
-            for j in range(0, p):
-                punto_prueba = Punto(i, j)
-                if CurvaElipticaModular.es_punto(punto_prueba, a, b, p):
-                    puntos.append(Punto(i, j))
+        for x in range(0, p):
+            y = raices[(x * x * x + a * x + b) % p]
+            if y == 0 or 2 * y == p:
+                puntos.append(Punto(x, y))
+            elif y > 0:
+                puntos.append(Punto(x, y))
+                puntos.append(Punto(x, p - y))
         return puntos
 
     @staticmethod
@@ -183,39 +817,81 @@ class CurvaElipticaModular:
         :param p: el número primo sobre el que se define la curva.
         :returns: True si el punto es parte de la curva, False en otro caso.'''
 
+        if punto.es_infinito():
+            return True
         lhs = pow(punto.y, 2, p)
         rhs = cong_mod_M((punto.x ** 3) + (a * punto.x) + b, p)
         return lhs == rhs
 
 class Punto:
     '''Representa un punto en el plano, con coordenadas X y Y. Usado en las
-    operaciones de curvas elípticas.'''
-    
-    x = None
-    y = None
+    operaciones de curvas elípticas. Los puntos son inmutables y pueden
+    usarse como llaves de diccionarios y elementos de conjuntos; sólo guardan
+    sus dos coordenadas (__slots__), sin un diccionario por objeto.
 
-    def __init__(self, coord_x, coord_y):
-        '''Inicializa un nuevo punto, con las coordenadas especificadas.
+    El punto al infinito es un único objeto, Punto.infinito, sin coordenadas
+    numéricas. Punto(float('inf'), float('inf')) devuelve ese mismo objeto.'''
+
+    __slots__ = ('x', 'y')
+
+    # El punto al infinito; se crea después de la clase.
+    infinito = None
+
+    def __new__(cls, coord_x, coord_y):
+        '''Crea un nuevo punto, con las coordenadas especificadas.
 
         :param coord_x: el valor numérico de la coordenada x.
-        :param coord_y: el valor numérico de la coordenada y. '''
-        
-        self.x = coord_x
-        self.y = coord_y
+        :param coord_y: el valor numérico de la coordenada y.
+        :returns: el punto; si las coordenadas son infinitas (o None), el
+                  punto al infinito.'''
+
+        if Punto.infinito is not None and (coord_x is None or coord_x == float('inf')):
+            return Punto.infinito
+        punto = object.__new__(cls)
+        object.__setattr__(punto, 'x', coord_x)
+        object.__setattr__(punto, 'y', coord_y)
+        return punto
+
+    def __setattr__(self, nombre, valor):
+        '''Los puntos son inmutables.'''
+
+        raise AttributeError('Las coordenadas de un punto no se pueden modificar.')
+
+    def __reduce__(self):
+        '''Permite copiar y serializar puntos, conservando el punto al
+        infinito como único.'''
+
+        return (Punto, (self.x, self.y))
 
     def __str__(self):
         '''Representación en String de un punto.
 
         :returns: una cadena con la representación del punto.'''
 
+        if self.es_infinito():
+            return '(inf, inf)'
         return f'({self.x}, {self.y})'
 
+    def __repr__(self):
+        '''Representación de un punto para depuración.
+
+        :returns: una cadena con la representación del punto.'''
+
+        return 'Punto' + str(self)
+
     def __eq__(self, punto):
         '''Verifica si dos puntos son iguales. Dos puntos son iguales si sus
         coordenadas con las mismas.'''
 
+        if not isinstance(punto, Punto):
+            return NotImplemented
         return self.x == punto.x and self.y == punto.y
 
+    def __hash__(self):
+        '''Valor hash del punto, a partir de sus coordenadas.'''
+
+        return hash((self.x, self.y))
+
     def es_infinito(self):
         '''Verifica si el punto representa al punto al infinito, es decir, el
         neutro aditivo para los puntos en una curva elíptica.
@@ -223,23 +899,162 @@ class Punto:
         :returns: True si el punto es el punto al infinito, False en otro
         caso.'''
 
-        return self.x == float('inf') and self.y == float('inf')
+        return self is Punto.infinito
+
+Punto.infinito = Punto(None, None)
+
+class PuntoJacobiano:
+    '''Representa un punto de una curva elíptica en coordenadas jacobianas
+    (X, Y, Z), que corresponde con el punto (X / Z^2, Y / Z^3). Sumar y
+    duplicar puntos en estas coordenadas no requiere inversos modulares: en
+    una cadena de operaciones sólo se invierte Z una vez, al convertir el
+    resultado a Punto. El punto al infinito es el que tiene Z = 0.
+
+    Las operaciones reciben la constante A y el primo P de la curva, de modo
+    que pueden usarse sin construir una CurvaElipticaModular.'''
+
+    __slots__ = ('x', 'y', 'z')
+
+    def __init__(self, coord_x, coord_y, coord_z=1):
+        '''Inicializa un nuevo punto, con las coordenadas especificadas.
+
+        :param coord_x: el valor numérico de la coordenada X.
+        :param coord_y: el valor numérico de la coordenada Y.
+        :param coord_z: el valor numérico de la coordenada Z.'''
+
+        self.x = coord_x
+        self.y = coord_y
+        self.z = coord_z
+
+    def __str__(self):
+        '''Representación en String de un punto jacobiano.
+
+        :returns: una cadena con la representación del punto.'''
+
+        return f'({self.x} : {self.y} : {self.z})'
+
+    @staticmethod
+    def desde_punto(punto):
+        '''Convierte un punto en coordenadas afines a coordenadas jacobianas.
+
+        :param punto: el punto a convertir.
+        :returns: el punto jacobiano (x, y, 1), o (1, 1, 0) para el punto al
+                  infinito.'''
+
+        if punto.es_infinito():
+            return PuntoJacobiano(1, 1, 0)
+        return PuntoJacobiano(punto.x, punto.y, 1)
+
+    def a_punto(self, p):
+        '''Convierte el punto a coordenadas afines, con un solo inverso
+        modular.
+
+        :param p: el primo sobre el que se define la curva.
+        :returns: el Punto (X / Z^2, Y / Z^3) módulo P.'''
+
+        if self.es_infinito():
+            return Punto.infinito
+        inv_z = inverso(self.z, p)
+        inv_z2 = inv_z * inv_z % p
+        return Punto(self.x * inv_z2 % p, self.y * inv_z2 * inv_z % p)
+
+    def es_infinito(self):
+        '''Verifica si el punto es el punto al infinito.
+
+        :returns: True si Z es cero, False en otro caso.'''
+
+        return self.z == 0
+
+    def negativo(self, p):
+        '''Obtiene el inverso aditivo del punto: (X, -Y, Z).
+
+        :param p: el primo sobre el que se define la curva.
+        :returns: el punto jacobiano inverso.'''
+
+        return PuntoJacobiano(self.x, -self.y % p, self.z)
+
+    def duplica(self, a, p):
+        '''Calcula el doble del punto, sin inversos modulares.
+
+        :param a: la constante A de la curva.
+        :param p: el primo sobre el que se define la curva.
+        :returns: el punto jacobiano 2 * (este punto).'''
+
+        if self.z == 0 or self.y == 0:
+            return PuntoJacobiano(1, 1, 0)
+        x, y, z = self.x, self.y, self.z
+        yy = y * y % p
+        s = 4 * x * yy % p
+        zz = z * z % p
+        m = (3 * x * x + a * zz * zz) % p
+        x3 = (m * m - 2 * s) % p
+        y3 = (m * (s - x3) - 8 * yy * yy) % p
+        z3 = 2 * y * z % p
+        return PuntoJacobiano(x3, y3, z3)
+
+    def suma(self, otro, a, p):
+        '''Calcula la suma de este punto con otro, sin inversos modulares.
+
+        :param otro: el punto jacobiano a sumar.
+        :param a: la constante A de la curva.
+        :param p: el primo sobre el que se define la curva.
+        :returns: el punto jacobiano resultante.'''
+
+        if self.z == 0:
+            return otro
+        if otro.z == 0:
+            return self
+        z1z1 = self.z * self.z % p
+        z2z2 = otro.z * otro.z % p
+        u1 = self.x * z2z2 % p
+        u2 = otro.x * z1z1 % p
+        s1 = self.y * otro.z * z2z2 % p
+        s2 = otro.y * self.z * z1z1 % p
+        if u1 == u2:
+            if s1 != s2:
+                return PuntoJacobiano(1, 1, 0)    # Punto al infinito
+            return self.duplica(a, p)
+        h = (u2 - u1) % p
+        r = (s2 - s1) % p
+        hh = h * h % p
+        hhh = h * hh % p
+        v = u1 * hh % p
+        x3 = (r * r - hhh - 2 * v) % p
+        y3 = (r * (v - x3) - s1 * hhh) % p
+        z3 = self.z * otro.z * h % p
+        return PuntoJacobiano(x3, y3, z3)
+
+    def multiplica(self, n, a, p):
+        '''Calcula N veces este punto, duplicando y sumando, sin inversos
+        modulares.
+
+        :param n: un entero no negativo.
+        :param a: la constante A de la curva.
+        :param p: el primo sobre el que se define la curva.
+        :returns: el punto jacobiano N * (este punto).'''
+
+        resultado = PuntoJacobiano(1, 1, 0)
+        for bit in bin(n)[2:]:
+            resultado = resultado.duplica(a, p)
+            if bit == '1':
+                resultado = resultado.suma(self, a, p)
+        return resultado
 
 # ------------------------------------------------------------------------------
 # --                     Funciones de aritmética modular                      --
 # ------------------------------------------------------------------------------
 
+@lru_cache(maxsize=1024)
 def es_primo(n):
-    '''Determina si N es primo o no.
+    '''Determina si N es primo o no, con la prueba de Miller-Rabin (ver
+    aritmetica_modular.es_primo_probable), que es determinista para N de
+    hasta 64 bits. El resultado se guarda, así que validar de nuevo el primo
+    de una curva ya creada no cuesta nada.
 
     :param n: el numero que se desea ver si es primo.
     :returns: true si N es primo, false en otro caso.'''
 
-    divs = 0
-    for i in range(1, n + 1):
-        if n % i == 0:
-            divs += 1
-    return divs == 2
+    return es_primo_probable(n, semilla=n)
 
 def cong_mod_M(a, m):
     '''Obtiene el valor al que el numero especificado sea congruente, modulo M.
@@ -248,29 +1063,67 @@ def cong_mod_M(a, m):
     :param m: un entero que representa el modulo.
     :returns: el entero x que satisface la congruencia a = x (mod m). '''
 
-    if 0 <= a and a < m:
-        return a
-    elif a >= m:
-        return a % m
-    else:
-        val = a
-        while val < 0:
-            val += m
-        return val
+    return reduce_mod(a, m)
 
 def inverso(a, p):
     '''Obtiene el inverso multiplicativo del valor especificado, modulo P. El
-    valor especificado P debe ser primo y A debe cumplir 0 <= A < P.
+    valor especificado P debe ser primo. Se calcula con pow, que usa el
+    algoritmo extendido de Euclides.
 
     :param a: el valor para el que se busca el inverso multiplicativo.
     :param p: el numero primo sobre el que se define el modulo. P debe ser primo.
     :returns: el inverso multiplicativo de a, modulo M.'''
 
-    if es_primo(p):
-        for i in range(0, p):
-            val = cong_mod_M(a * i, p)
-            if val == 1:
-                return i
-        raise Exception('No se pudo encontrar el inverso. Si estas viendo esto, algo muy raro paso. D:')
-    else:
-         raise Exception('El valor P no es primo.')
+    if a % p == 0:
+        raise Exception('El valor no tiene inverso módulo P.')
+    return inverso_mod(a, p)
+
+def forma_naf(n, ancho=2):
+    '''Escribe el entero positivo N en forma NAF (forma no adyacente) de
+    ancho W: N = sum(d_i * 2^i), donde cada dígito d_i es cero o un impar con
+    |d_i| < 2^(W-1), y de cada W dígitos consecutivos a lo más uno no es cero.
+
+    :param n: un entero positivo.
+    :param ancho: el ancho W de la forma, 2 o más.
+    :returns: la lista de dígitos, del menos significativo al más
+              significativo.'''
+
+    modulo = 1 << ancho
+    digitos = []
+    while n > 0:
+        if n & 1:
+            digito = n % modulo
+            if digito >= modulo // 2:
+                digito -= modulo
+            n -= digito
+        else:
+            digito = 0
+        digitos.append(digito)
+        n >>= 1
+    return digitos
+
+def factoriza(n):
+    '''Obtiene la factorización en primos de N por división de prueba.
+
+    :param n: un entero positivo.
+    :returns: un diccionario que asocia cada factor primo de N con su
+              exponente.'''
+
+    factores = {}
+    d = 2
+    while d * d <= n:
+        while n % d == 0:
+            factores[d] = factores.get(d, 0) + 1
+            n //= d
+        d += 1 if d == 2 else 2
+    if n > 1:
+        factores[n] = factores.get(n, 0) + 1
+    return factores
+
+# ------------------------------------------------------------------------------
+# --                              CONSTANTES                                  --
+# ------------------------------------------------------------------------------
+
+# Por debajo de este primo, numero_puntos cuenta los puntos con una tabla de
+# raíces cuadradas en O(P); por encima usa el método de Mestre.
+limite_conteo_tabla = 1 << 12
@@ -0,0 +1,218 @@
+'''
+Mediciones de rendimiento de las operaciones de curvas elípticas. Se ejecuta
+desde el directorio src/:
+
+    python3 rendimiento_ecc.py
+'''
+
+from timeit import timeit
+
+import ecc
+
+def mide(funcion, repeticiones=1):
+    '''Mide el tiempo promedio de ejecución de la función especificada.
+
+    :param funcion: una función sin argumentos.
+    :param repeticiones: la cantidad de veces que se ejecutará la función.
+    :returns: el tiempo promedio, en segundos.'''
+
+    return timeit(funcion, number=repeticiones) / repeticiones
+
+def reporta(nombre, t_original, t_nuevo):
+    '''Imprime la comparación de tiempos entre dos implementaciones.
+
+    :param nombre: el nombre de la operación medida.
+    :param t_original: el tiempo de la implementación original, en segundos.
+    :param t_nuevo: el tiempo de la implementación nueva, en segundos.'''
+
+    print(f'{nombre}: original {t_original:.4f} s, nuevo {t_nuevo:.6f} s '
+          f'({t_original / t_nuevo:.0f}x)')
+
+# Curva P-256 (NIST): y^2 = x^3 - 3x + B sobre un primo de 256 bits.
+p256 = 0xffffffff00000001000000000000000000000000ffffffffffffffffffffffff
+a256 = p256 - 3
+b256 = 0x5ac635d8aa3a93e7b3ebbd55769886bc651d06b0cc53b0f63bce3c3e27d2604b
+g256 = ecc.Punto(0x6b17d1f2e12c4247f8bce6e563a440f277037d812deb33a0f4a13945d898c296,
+                 0x4fe342e2fe1a7f9b8ee7eb4a7c0f9e162bce33576b315ececbb6406837bf51f5)
+n256 = 0xffffffff00000000ffffffffffffffffbce6faada7179e84f3b9cac2fc632551
+
+# ------------------------------------------------------------------------------
+# --                              PRIMALIDAD                                  --
+# ------------------------------------------------------------------------------
+
+def es_primo_por_divisores(n):
+    '''Implementación original de es_primo, que cuenta los divisores de N
+    entre 1 y N. Se conserva como referencia para las mediciones.'''
+
+    divs = 0
+    for i in range(1, n + 1):
+        if n % i == 0:
+            divs += 1
+    return divs == 2
+
+primo = 1000003
+assert es_primo_por_divisores(primo) and ecc.es_primo_probable(primo)
+t_original = mide(lambda: es_primo_por_divisores(primo))
+t_nuevo = mide(lambda: ecc.es_primo_probable(primo), 10000)
+reporta(f'Primalidad de {primo}', t_original, t_nuevo)
+
+# La implementación original tardaría cerca de un minuto con este primo.
+primo = 1000000007
+t = mide(lambda: ecc.es_primo_probable(primo), 10000)
+print(f'Primalidad de {primo} (Miller-Rabin): {t:.6f} s')
+t_256 = mide(lambda: ecc.es_primo_probable(p256), 100)
+print(f'Primalidad del primo de P-256 (Miller-Rabin): {t_256:.6f} s')
+t = mide(lambda: ecc.CurvaElipticaModular(p256, a256, b256), 100)
+print(f'Creación de la curva P-256: {t:.6f} s')
+
+# ------------------------------------------------------------------------------
+# --                          INVERSOS MODULARES                              --
+# ------------------------------------------------------------------------------
+
+def inverso_lineal(a, p):
+    '''Implementación original de inverso, buscando el inverso entre todos
+    los residuos. Se conserva como referencia para las mediciones.'''
+
+    for i in range(0, p):
+        if a * i % p == 1:
+            return i
+
+primo = 1000003
+t_original = mide(lambda: inverso_lineal(123456, primo), 5)
+t_nuevo = mide(lambda: ecc.inverso(123456, primo), 10000)
+reporta(f'Inverso módulo {primo}', t_original, t_nuevo)
+
+t_256 = mide(lambda: ecc.inverso(g256.x, p256), 10000)
+print(f'Inverso módulo el primo de P-256: {t_256:.6f} s')
+
+# ------------------------------------------------------------------------------
+# --                      MULTIPLICACION POR ESCALAR                          --
+# ------------------------------------------------------------------------------
+
+def multiplica_afin(punto, n, a, p):
+    '''Duplicar y sumar en coordenadas afines, con un inverso modular en cada
+    suma de puntos. Se conserva como referencia para las mediciones.'''
+
+    resultado = None
+    for bit in bin(n)[2:]:
+        if resultado is not None:
+            resultado = suma_afin(resultado, resultado, a, p)
+        if bit == '1':
+            resultado = punto if resultado is None else suma_afin(resultado, punto, a, p)
+    return resultado
+
+def suma_afin(punto1, punto2, a, p):
+    '''Suma de puntos en coordenadas afines (sin el caso del punto al
+    infinito, que no aparece en estas mediciones).'''
+
+    if punto1.x == punto2.x:
+        val_lambda = (3 * punto1.x * punto1.x + a) * ecc.inverso(2 * punto1.y, p)
+    else:
+        val_lambda = (punto2.y - punto1.y) * ecc.inverso(punto2.x - punto1.x, p)
+    x3 = (val_lambda * val_lambda - punto1.x - punto2.x) % p
+    return ecc.Punto(x3, (val_lambda * (punto1.x - x3) - punto1.y) % p)
+
+escalar = 0x3c8f1e6d2b7a9405e1c6f3d8a2b9e7c4105d6f8a3b2c9e1d7f4a6b8c0e2d4f61
+jacobiano = ecc.PuntoJacobiano.desde_punto(g256)
+assert (multiplica_afin(g256, escalar, a256, p256)
+        == jacobiano.multiplica(escalar, a256, p256).a_punto(p256))
+assert jacobiano.multiplica(n256, a256, p256).es_infinito()
+
+t_original = mide(lambda: multiplica_afin(g256, escalar, a256, p256), 10)
+t_nuevo = mide(lambda: jacobiano.multiplica(escalar, a256, p256).a_punto(p256), 10)
+reporta('Multiplicación por escalar en P-256 (afín contra jacobiano)', t_original, t_nuevo)
+
+curva256 = ecc.CurvaElipticaModular(p256, a256, b256)
+escalares = [(escalar * (i + 3)) % n256 for i in range(20)]
+assert all(curva256.exp_base_fija(g256, k) == curva256.exp_puntos(g256, k) for k in escalares[:3])
+t_original = mide(lambda: [curva256.exp_puntos(g256, k) for k in escalares])
+t_nuevo = mide(lambda: [curva256.exp_base_fija(g256, k) for k in escalares])
+reporta('20 multiplicaciones del generador de P-256 (base fija)', t_original, t_nuevo)
+
+# Verificación de una firma ECDSA: u1 * G + u2 * Q.
+q256 = curva256.exp_puntos(g256, escalar)
+u1, u2 = escalares[0], escalares[1]
+assert (curva256.exp_multiple([u1, u2], [g256, q256])
+        == curva256.suma(curva256.exp_puntos(g256, u1), curva256.exp_puntos(q256, u2)))
+t_original = mide(lambda: curva256.suma(curva256.exp_puntos(g256, u1),
+                                        curva256.exp_puntos(q256, u2)), 10)
+t_nuevo = mide(lambda: curva256.exp_multiple([u1, u2], [g256, q256]), 10)
+reporta('u1 * G + u2 * Q en P-256 (Straus/Shamir)', t_original, t_nuevo)
+
+def exp_puntos_iterada(curva, punto, n):
+    '''Implementación original de exp_puntos: suma el punto N - 1 veces,
+    verificando en cada suma que los puntos estén en la lista de puntos de la
+    curva. Se conserva como referencia para las mediciones.'''
+
+    parcial = punto
+    for _ in range(1, n):
+        if parcial not in curva.puntos or punto not in curva.puntos:
+            raise ValueError('Los puntos especificados no forman parte de la curva.')
+        parcial = curva.suma(parcial, punto)
+    return parcial
+
+curva = ecc.CurvaElipticaModular(1009, 2, 3, enumerar=True)
+base = curva.puntos[1]
+# La suma iterada no admite el punto al infinito: N debe ser menor que el
+# orden del punto.
+n = curva.orden(base) - 1
+assert exp_puntos_iterada(curva, base, n) == curva.exp_puntos(base, n)
+t_original = mide(lambda: exp_puntos_iterada(curva, base, n))
+t_nuevo = mide(lambda: curva.exp_puntos(base, n), 1000)
+reporta(f'exp_puntos(P, {n}) sobre p = 1009', t_original, t_nuevo)
+
+# ------------------------------------------------------------------------------
+# --                            CANTIDAD DE PUNTOS                            --
+# ------------------------------------------------------------------------------
+
+primo = 100003
+numero = len(ecc.CurvaElipticaModular.soluciones_curva(2, 3, primo)) + 1
+assert numero == ecc.CurvaElipticaModular.numero_puntos_tabla(2, 3, primo)
+assert numero == ecc.CurvaElipticaModular.numero_puntos_mestre(2, 3, primo)
+t_original = mide(lambda: len(ecc.CurvaElipticaModular.soluciones_curva(2, 3, primo)) + 1)
+t_tabla = mide(lambda: ecc.CurvaElipticaModular.numero_puntos_tabla(2, 3, primo))
+t_nuevo = mide(lambda: ecc.CurvaElipticaModular.numero_puntos_mestre(2, 3, primo), 10)
+reporta(f'Cantidad de puntos sobre p = {primo} (enumeración contra Mestre)', t_original, t_nuevo)
+print(f'    con la tabla de raíces cuadradas: {t_tabla:.4f} s')
+
+for primo in [2 ** 31 - 1, 10 ** 12 + 39, 2 ** 61 - 1]:
+    t = mide(lambda: ecc.CurvaElipticaModular.numero_puntos_mestre(2, 3, primo))
+    print(f'Cantidad de puntos sobre p = {primo} (Mestre): {t:.4f} s')
+
+# ------------------------------------------------------------------------------
+# --                            CURVAS VALIDAS                                --
+# ------------------------------------------------------------------------------
+
+def curvas_validas_por_pares(p):
+    '''Implementación original de curvas_validas, con un discriminante por
+    cada par (A, B). Se conserva como referencia para las mediciones.'''
+
+    pares = []
+    for i in range(0, p):
+        for j in range(0, p):
+            if ecc.CurvaElipticaModular.curva_discriminante(i, j, p) != 0:
+                pares.append((i, j))
+    return pares
+
+primo = 1009
+assert curvas_validas_por_pares(primo) == ecc.CurvaElipticaModular.curvas_validas(primo)
+t_original = mide(lambda: curvas_validas_por_pares(primo))
+t_nuevo = mide(lambda: ecc.CurvaElipticaModular.curvas_validas(primo))
+reporta(f'Curvas válidas sobre p = {primo}', t_original, t_nuevo)
+
+primo = 30011
+t = mide(lambda: ecc.CurvaElipticaModular.conteo_curvas(primo))
+print(f'Conteo de curvas válidas e inválidas sobre p = {primo}: {t:.4f} s')
+
+# ------------------------------------------------------------------------------
+# --                          LOGARITMO DISCRETO                              --
+# ------------------------------------------------------------------------------
+
+curva = ecc.CurvaElipticaModular(100003, 2, 3)
+base = curva.puntos_con_x(1)[0] if curva.puntos_con_x(1) else curva.puntos[0]
+orden_base = curva.orden(base)
+objetivo = curva.exp_puntos(base, orden_base - 12345)
+print(f'Logaritmo discreto sobre p = 100003, orden de la base {orden_base}:')
+for metodo in ['fuerza_bruta', 'bsgs', 'rho', 'pohlig_hellman']:
+    t = mide(lambda: curva.logaritmo(objetivo, base, metodo))
+    print(f'    {metodo}: {t:.4f} s')